@@ -1,9 +1,46 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db.models.functions import Substr
 from django.utils.html import format_html
 from .models import User, StatusUpdate, UserProfile
 
 
+# Extra sections appended to the base user admin change form
+PROFILE_FIELDSETS = (
+    ('Profile Information', {
+        'fields': (
+            'user_type', 'bio', 'profile_picture', 
+            'phone_number', 'location'
+        )
+    }),
+    ('Professional Information', {
+        'fields': ('qualification', 'experience_years'),
+        'classes': ('collapse',)  # Make this section collapsible
+    }),
+    ('Account Settings', {
+        'fields': ('is_verified',)
+    }),
+)
+
+# Extra add-form fields, skipping any the base add form already renders
+_BASE_ADD_FIELDS = {
+    field
+    for _, options in BaseUserAdmin.add_fieldsets
+    for field in options['fields']
+}
+PROFILE_ADD_FIELDSETS = (
+    ('Profile Information', {
+        'fields': tuple(
+            field for field in (
+                'email', 'first_name', 'last_name', 
+                'user_type', 'bio'
+            )
+            if field not in _BASE_ADD_FIELDS
+        )
+    }),
+)
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     """Admin interface for custom User model"""
@@ -32,36 +69,18 @@ class UserAdmin(BaseUserAdmin):
     # Number of items per page
     list_per_page = 25
     
+    # Join related rows in the changelist query
+    list_select_related = ['profile']
+    
     # Add custom fieldsets for the edit form
-    fieldsets = BaseUserAdmin.fieldsets + (
-        ('Profile Information', {
-            'fields': (
-                'user_type', 'bio', 'profile_picture', 
-                'phone_number', 'location'
-            )
-        }),
-        ('Professional Information', {
-            'fields': ('qualification', 'experience_years'),
-            'classes': ('collapse',)  # Make this section collapsible
-        }),
-        ('Account Settings', {
-            'fields': ('is_verified',)
-        }),
-    )
+    fieldsets = BaseUserAdmin.fieldsets + PROFILE_FIELDSETS
     
     # Fields to display when adding a new user
-    add_fieldsets = BaseUserAdmin.add_fieldsets + (
-        ('Profile Information', {
-            'fields': (
-                'email', 'first_name', 'last_name', 
-                'user_type', 'bio'
-            )
-        }),
-    )
+    add_fieldsets = BaseUserAdmin.add_fieldsets + PROFILE_ADD_FIELDSETS
     
     def get_queryset(self, request):
-        """Optimize queries by selecting related fields"""
-        return super().get_queryset(request).select_related('profile')
+        """Skip the bio text column, which the changelist never shows"""
+        return super().get_queryset(request).defer('bio')
 
 
 @admin.register(StatusUpdate)
@@ -73,18 +92,27 @@ class StatusUpdateAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'content']
     ordering = ['-created_at']
     list_per_page = 25
+    list_select_related = ['user']
     
     # Make some fields read-only
     readonly_fields = ['created_at', 'updated_at']
     
+    # Characters shown in the changelist preview
+    preview_length = 50
+    
+    def get_queryset(self, request):
+        """Fetch only the start of the content for the preview column"""
+        return super().get_queryset(request).annotate(
+            content_short=Substr('content', 1, self.preview_length + 1)
+        ).defer('content')
+    
     def content_preview(self, obj):
         """Show a preview of the content"""
-        return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
+        preview = obj.content_short
+        if len(preview) > self.preview_length:
+            return preview[:self.preview_length] + "..."
+        return preview
     content_preview.short_description = 'Content Preview'
-    
-    def get_queryset(self, request):
-        """Optimize queries"""
-        return super().get_queryset(request).select_related('user')
 
 
 @admin.register(UserProfile)
@@ -102,6 +130,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email']
     ordering = ['-last_activity']
     list_per_page = 25
+    list_select_related = ['user']
     
     # Organize fields into sections
     fieldsets = (
@@ -129,10 +158,6 @@ class UserProfileAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['profile_views', 'last_activity', 'created_at', 'updated_at']
-    
-    def get_queryset(self, request):
-        """Optimize queries"""
-        return super().get_queryset(request).select_related('user')
 
 
 # Customize admin site headers
@@ -1,6 +1,6 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -11,16 +11,29 @@ class EmailOrUsernameModelBackend(ModelBackend):
     their username or email address.
     """
     
+    def get_user_by_login(self, login):
+        """
+        Find a user by username or email using indexed equality probes,
+        stopping at the first match instead of running a single OR query.
+        """
+        user = User.objects.filter(username=login).first()
+        if user is None and '@' in login:
+            # Emails are stored lowercased, so an exact match hits the unique index
+            user = User.objects.filter(email=login.strip().lower()).first()
+        if user is None:
+            # Keep usernames case-insensitive for anyone not typing the exact
+            # case; LOWER(username) matches the user_username_lower_idx index
+            user = User.objects.alias(
+                username_lower=Lower('username')
+            ).filter(username_lower=login.lower()).first()
+        return user
+    
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None or password is None:
             return None
         
-        try:
-            # Try to find user by username or email
-            user = User.objects.get(
-                Q(username__iexact=username) | Q(email__iexact=username)
-            )
-        except User.DoesNotExist:
+        user = self.get_user_by_login(username)
+        if user is None:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user
             User().set_password(password)
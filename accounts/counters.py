@@ -0,0 +1,66 @@
+"""
+Buffered profile view counters.
+
+Profile views are counted with atomic cache increments and folded into
+``UserProfile.profile_views`` by the periodic ``flush_profile_views`` task,
+so viewing a profile never writes to the database.
+
+A counter that goes from zero to non-zero claims a numbered slot holding the
+user's id; the flush walks the slots claimed since its last run instead of
+scanning every counter key.
+"""
+
+from django.core.cache import cache
+
+from .models import UserProfile
+
+PROFILE_VIEWS_KEY = 'profile_views:{}'
+PROFILE_VIEWS_SLOTS_KEY = 'profile_views:slots'
+PROFILE_VIEWS_SLOT_KEY = 'profile_views:slot:{}'
+PROFILE_VIEWS_FLUSHED_KEY = 'profile_views:flushed'
+
+# Idle counters expire after a week; pending ones are flushed long before
+PROFILE_VIEWS_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _claim_slot(user_id):
+    """Queue a user's counter for the next flush"""
+    cache.add(PROFILE_VIEWS_SLOTS_KEY, 0, None)
+    slot = cache.incr(PROFILE_VIEWS_SLOTS_KEY)
+    cache.set(PROFILE_VIEWS_SLOT_KEY.format(slot), user_id, None)
+
+
+def record_profile_view(user_id):
+    """Count one view of a user's profile"""
+    key = PROFILE_VIEWS_KEY.format(user_id)
+    cache.add(key, 0, PROFILE_VIEWS_TIMEOUT)
+    if cache.incr(key) == 1:
+        _claim_slot(user_id)
+
+
+def flush_profile_views():
+    """Add buffered view counts to the database, returning how many were flushed"""
+    flushed = cache.get(PROFILE_VIEWS_FLUSHED_KEY, 0)
+    last = cache.get(PROFILE_VIEWS_SLOTS_KEY, 0)
+    if last <= flushed:
+        return 0
+    
+    slot_keys = [PROFILE_VIEWS_SLOT_KEY.format(slot) for slot in range(flushed + 1, last + 1)]
+    user_ids = set(cache.get_many(slot_keys).values())
+    cache.set(PROFILE_VIEWS_FLUSHED_KEY, last, None)
+    cache.delete_many(slot_keys)
+    
+    counts = cache.get_many([PROFILE_VIEWS_KEY.format(user_id) for user_id in user_ids])
+    total = 0
+    for user_id in user_ids:
+        key = PROFILE_VIEWS_KEY.format(user_id)
+        views = counts.get(key)
+        if not views:
+            continue
+        UserProfile.bump_view(user_id, views)
+        total += views
+        # Views counted while flushing keep the counter above zero, and a
+        # counter above zero never claims a slot itself, so claim one here
+        if cache.decr(key, views) > 0:
+            _claim_slot(user_id)
+    return total
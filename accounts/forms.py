@@ -2,10 +2,14 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from .models import StatusUpdate, UserProfile
 
 User = get_user_model()
 
+# User type choices with an "any type" option for search filters
+USER_TYPE_CHOICES_WITH_BLANK = (('', 'All Users'),) + tuple(User.USER_TYPE_CHOICES)
+
 
 class CustomUserCreationForm(UserCreationForm):
     """Custom user registration form"""
@@ -80,8 +84,8 @@ class CustomUserCreationForm(UserCreationForm):
     
     def clean_email(self):
         """Validate email uniqueness"""
-        email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
+        email = self.cleaned_data.get('email', '').strip().lower()
+        if User.objects.filter(email=email).only('pk').exists():
             raise ValidationError("A user with this email already exists.")
         return email
     
@@ -95,9 +99,9 @@ class CustomUserCreationForm(UserCreationForm):
         user.bio = self.cleaned_data['bio']
         
         if commit:
-            user.save()
-            # Create user profile
-            UserProfile.objects.create(user=user)
+            # The profile row is created by the post_save signal
+            with transaction.atomic():
+                user.save()
         
         return user
 
@@ -169,18 +173,13 @@ class UserProfileForm(forms.ModelForm):
                 'max': 50
             }),
         }
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        # Make experience_years only required for teachers
-        if self.instance and self.instance.user_type == 'student':
-            self.fields['qualification'].required = False
-            self.fields['experience_years'].required = False
-        
-        # Add help texts
-        self.fields['profile_picture'].help_text = 'Upload an image (max size: 10MB)'
-        self.fields['experience_years'].help_text = 'Number of years teaching experience'
+        # Declared once on the class instead of patched onto every instance.
+        # qualification and experience_years are blank=True on the model, so
+        # they are already optional for students and teachers alike.
+        help_texts = {
+            'profile_picture': 'Upload an image (max size: 10MB)',
+            'experience_years': 'Number of years teaching experience',
+        }
 
 
 class UserProfileExtendedForm(forms.ModelForm):
@@ -261,7 +260,7 @@ class TeacherSearchForm(forms.Form):
     )
     
     user_type = forms.ChoiceField(
-        choices=[('', 'All Users')] + User.USER_TYPE_CHOICES,
+        choices=USER_TYPE_CHOICES_WITH_BLANK,
         required=False,
         widget=forms.Select(attrs={
             'class': 'form-control'
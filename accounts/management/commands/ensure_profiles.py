@@ -0,0 +1,50 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from accounts.models import User, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Create missing UserProfile rows for existing users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of profiles inserted per query'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Stream ids from a server-side cursor so memory stays bounded
+        missing_ids = (
+            User.objects.filter(profile__isnull=True)
+            .values_list('id', flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+        
+        created_count = 0
+        while True:
+            batch = list(islice(missing_ids, batch_size))
+            if not batch:
+                break
+            
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id) for user_id in batch],
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+            created_count += len(batch)
+        
+        if not created_count:
+            self.stdout.write(
+                self.style.SUCCESS('All users already have profiles!')
+            )
+            return
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Successfully created {created_count} user profile(s)!'
+            )
+        )
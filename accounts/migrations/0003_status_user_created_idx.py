@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-15 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='statusupdate',
+            index=models.Index(fields=['user', '-created_at'], name='status_user_created_idx'),
+        ),
+    ]
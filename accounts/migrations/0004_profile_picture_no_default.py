@@ -0,0 +1,36 @@
+# Generated by Django 4.2.15 on 2026-10-15 22:47
+
+from django.db import migrations, models
+
+
+DEFAULT_PROFILE_PICTURE = 'profiles/default.jpg'
+
+
+def clear_default_profile_pictures(apps, schema_editor):
+    """Users still on the old placeholder get an empty picture instead"""
+    User = apps.get_model('accounts', 'User')
+    User.objects.filter(profile_picture=DEFAULT_PROFILE_PICTURE).update(profile_picture='')
+
+
+def restore_default_profile_pictures(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    User.objects.filter(profile_picture='').update(profile_picture=DEFAULT_PROFILE_PICTURE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_status_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, help_text='Upload your profile picture', upload_to='profiles/'),
+        ),
+        migrations.RunPython(
+            clear_default_profile_pictures,
+            restore_default_profile_pictures,
+        ),
+    ]
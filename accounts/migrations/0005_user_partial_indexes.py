@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-15 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_profile_picture_no_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user_type', '-date_joined'], name='user_active_type_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_verified', True), ('user_type', 'teacher')), fields=['username'], name='user_verified_teachers_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.15 on 2026-10-15 22:53
+
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """Lowercase stored emails, leaving any that would collide for manual review"""
+    User = apps.get_model('accounts', 'User')
+    mixed_case = User.objects.exclude(email=Lower(F('email'))).values_list('pk', 'email')
+    for pk, email in mixed_case.iterator():
+        normalized = email.strip().lower()
+        if not User.objects.filter(email=normalized).exclude(pk=pk).exists():
+            User.objects.filter(pk=pk).update(email=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
@@ -1,24 +1,30 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
 from django.urls import reverse
-from PIL import Image
+from django.utils import timezone
+
+
+STUDENT = 'student'
+TEACHER = 'teacher'
 
 
 class User(AbstractUser):
     """Custom user model with additional fields for students and teachers"""
     
     USER_TYPE_CHOICES = [
-        ('student', 'Student'),
-        ('teacher', 'Teacher'),
+        (STUDENT, 'Student'),
+        (TEACHER, 'Teacher'),
     ]
     
     # Basic profile information
     email = models.EmailField(unique=True)
-    user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES, default='student')
+    user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES, default=STUDENT)
     bio = models.TextField(max_length=500, blank=True, help_text="Tell us about yourself")
     profile_picture = models.ImageField(
         upload_to='profiles/', 
-        default='profiles/default.jpg',
+        blank=True,
         help_text="Upload your profile picture"
     )
     phone_number = models.CharField(max_length=15, blank=True)
@@ -44,6 +50,22 @@ class User(AbstractUser):
         db_table = 'accounts_user'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            # Case-insensitive username logins (see EmailOrUsernameModelBackend)
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            # Partial indexes for the low-cardinality filters used by search and admin
+            models.Index(
+                fields=['user_type', '-date_joined'],
+                condition=Q(is_active=True),
+                name='user_active_type_joined_idx'
+            ),
+            models.Index(
+                fields=['username'],
+                condition=Q(is_verified=True, user_type=TEACHER),
+                name='user_verified_teachers_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
@@ -56,29 +78,39 @@ class User(AbstractUser):
         full_name = f"{self.first_name} {self.last_name}"
         return full_name.strip() or self.username
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Remember the stored picture so save() can tell when it changes
+        self._original_profile_picture = self._profile_picture_name()
+    
+    def _profile_picture_name(self):
+        """Return the current picture name without loading a deferred field"""
+        value = self.__dict__.get('profile_picture', models.DEFERRED)
+        return getattr(value, 'name', value)
+    
     def save(self, *args, **kwargs):
-        """Override save to resize profile pictures"""
+        """Override save to queue resizing of new profile pictures"""
         super().save(*args, **kwargs)
         
-        if self.profile_picture:
-            try:
-                img = Image.open(self.profile_picture.path)
-                if img.height > 300 or img.width > 300:
-                    output_size = (300, 300)
-                    img.thumbnail(output_size)
-                    img.save(self.profile_picture.path)
-            except Exception:
-                pass  # Handle cases where image processing fails
+        if (
+            self._original_profile_picture is not models.DEFERRED
+            and self.profile_picture
+            and self.profile_picture.name != self._original_profile_picture
+        ):
+            from .tasks import resize_profile_picture
+            user_id = self.pk
+            transaction.on_commit(lambda: resize_profile_picture.delay(user_id))
+        self._original_profile_picture = self._profile_picture_name()
     
     @property
     def is_teacher(self):
         """Check if user is a teacher"""
-        return self.user_type == 'teacher'
+        return self.user_type == TEACHER
     
     @property
     def is_student(self):
         """Check if user is a student"""
-        return self.user_type == 'student'
+        return self.user_type == STUDENT
     
     def get_courses_as_teacher(self):
         """Get courses where this user is the teacher"""
@@ -89,7 +121,15 @@ class User(AbstractUser):
     def get_enrolled_courses(self):
         """Get courses where this user is enrolled as student"""
         if self.is_student:
-            return self.enrollments.filter(is_active=True).select_related('course')
+            # Only load the columns listings render, leaving prerequisites, learning
+            # outcomes and the SEO fields in the DB. description stays in the list
+            # because accounts/profile.html renders it; deferring it would cost one
+            # query per row
+            return self.enrollments.filter(is_active=True).select_related('course').only(
+                'id', 'student', 'course', 'is_active', 'progress', 'date_enrolled',
+                'course__id', 'course__title', 'course__slug', 'course__teacher',
+                'course__short_description', 'course__description',
+            )
         return None
 
 
@@ -105,6 +145,9 @@ class StatusUpdate(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Status Update'
         verbose_name_plural = 'Status Updates'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='status_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username}: {self.content[:50]}..."
@@ -144,3 +187,14 @@ class UserProfile(models.Model):
     
     def __str__(self):
         return f"{self.user.username}'s Profile"
+    
+    @classmethod
+    def bump_view(cls, user_id, views=1):
+        """Add ``views`` to the profile view counter with a single UPDATE"""
+        updated = cls.objects.filter(user_id=user_id).update(
+            profile_views=F('profile_views') + views,
+            last_activity=timezone.now()
+        )
+        if not updated:
+            # Users created before profiles were added may not have one yet
+            cls.objects.get_or_create(user_id=user_id, defaults={'profile_views': views})
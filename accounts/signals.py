@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .models import User, UserProfile
+
+
+@receiver(pre_save, sender=User)
+def normalize_user_email(sender, instance, **kwargs):
+    """
+    Store emails lowercased so lookups can use plain equality on the unique index
+    """
+    if instance.email:
+        instance.email = instance.email.strip().lower()
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, **kwargs):
+    """
+    Create the extended profile when a new user is saved
+    """
+    if created:
+        UserProfile.objects.get_or_create(user=instance)
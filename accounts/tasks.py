@@ -0,0 +1,33 @@
+from celery import shared_task
+from PIL import Image
+
+from . import counters
+from .models import User
+
+PROFILE_PICTURE_SIZE = (300, 300)
+
+
+@shared_task
+def resize_profile_picture(user_id):
+    """Shrink a user's profile picture to fit within PROFILE_PICTURE_SIZE"""
+    user = User.objects.filter(pk=user_id).only('profile_picture').first()
+    if user is None or not user.profile_picture:
+        return
+    
+    try:
+        with Image.open(user.profile_picture.path) as img:
+            if img.width <= PROFILE_PICTURE_SIZE[0] and img.height <= PROFILE_PICTURE_SIZE[1]:
+                return
+            if img.format == 'JPEG':
+                # Let libjpeg decode at a reduced scale instead of full resolution
+                img.draft('RGB', (PROFILE_PICTURE_SIZE[0] * 2, PROFILE_PICTURE_SIZE[1] * 2))
+            img.thumbnail(PROFILE_PICTURE_SIZE, Image.Resampling.LANCZOS)
+            img.save(user.profile_picture.path)
+    except Exception:
+        pass  # Handle cases where image processing fails
+
+
+@shared_task
+def flush_profile_views():
+    """Fold buffered profile view counts into UserProfile.profile_views"""
+    return counters.flush_profile_views()
@@ -1,10 +1,20 @@
-from django.test import TestCase, Client
-from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import authenticate, get_user_model
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from .backends import EmailOrUsernameModelBackend
 from .models import User, StatusUpdate, UserProfile
 from .forms import CustomUserCreationForm, UserProfileForm
+from .counters import flush_profile_views, record_profile_view
+from .tasks import resize_profile_picture
+from .views import CachedCountPaginator, get_recent_public_updates
 import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 from PIL import Image
 
 User = get_user_model()
@@ -69,24 +79,53 @@ class UserModelTest(TestCase):
         user = User.objects.create_user(**self.student_data)
         expected_str = f"{user.username} ({user.get_user_type_display()})"
         self.assertEqual(str(user), expected_str)
+    
+    def test_profile_picture_resize_queued_only_on_change(self):
+        """Test that resizing is queued only when the picture changes"""
+        user = User.objects.create_user(**self.student_data)
+        with mock.patch('accounts.tasks.resize_profile_picture.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                user.bio = 'Updated bio'
+                user.save()
+            delay.assert_not_called()
+            
+            with self.captureOnCommitCallbacks(execute=True):
+                user.profile_picture = 'profiles/new.jpg'
+                user.save()
+            delay.assert_called_once_with(user.pk)
+    
+    def test_resize_profile_picture_task(self):
+        """Test that the resize task shrinks large JPEG pictures"""
+        user = User.objects.create_user(**self.student_data)
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            buffer = BytesIO()
+            Image.new('RGB', (1200, 900), 'blue').save(buffer, format='JPEG')
+            upload = SimpleUploadedFile('big.jpg', buffer.getvalue(), content_type='image/jpeg')
+            user.profile_picture.save('big.jpg', upload, save=False)
+            User.objects.filter(pk=user.pk).update(profile_picture=user.profile_picture.name)
+            
+            resize_profile_picture(user.pk)
+            
+            with Image.open(user.profile_picture.path) as img:
+                self.assertEqual(img.size, (300, 225))
 
 
 class UserViewsTest(TestCase):
     """Test cases for User views"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = Client()
-        self.student = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class"""
+        cls.student = User.objects.create_user(
             username='teststudent',
             email='student@test.com',
             password='testpass123',
             user_type='student'
         )
-        self.teacher = User.objects.create_user(
+        # The teacher never logs in, so skip password hashing
+        cls.teacher = User.objects.create_user(
             username='testteacher',
             email='teacher@test.com',
-            password='testpass123',
             user_type='teacher'
         )
     
@@ -110,6 +149,7 @@ class UserViewsTest(TestCase):
         response = self.client.post(reverse('accounts:register'), data)
         self.assertEqual(response.status_code, 302)  # Redirect after successful registration
         self.assertTrue(User.objects.filter(username='newuser').exists())
+        self.assertEqual(UserProfile.objects.filter(user__username='newuser').count(), 1)
     
     def test_login_view(self):
         """Test login view"""
@@ -119,6 +159,38 @@ class UserViewsTest(TestCase):
         })
         self.assertEqual(response.status_code, 302)  # Redirect after login
     
+    def test_login_view_authenticates_once(self):
+        """Test that logging in checks the password only once"""
+        with mock.patch('django.contrib.auth.forms.authenticate', wraps=authenticate) as auth:
+            self.client.post(reverse('accounts:login'), {
+                'username': 'teststudent',
+                'password': 'testpass123'
+            })
+        self.assertEqual(auth.call_count, 1)
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.student.pk)
+    
+    def test_authenticate_with_email_or_username(self):
+        """Test that the backend accepts username or email in any case"""
+        for login in ('teststudent', 'TestStudent', 'Student@Test.com'):
+            user = authenticate(username=login, password='testpass123')
+            self.assertEqual(user, self.student)
+        self.assertIsNone(authenticate(username='nobody@test.com', password='testpass123'))
+    
+    def test_case_insensitive_username_lookup_uses_index(self):
+        """Test that the case-insensitive username probe can use its index"""
+        backend = EmailOrUsernameModelBackend()
+        self.assertEqual(backend.get_user_by_login('TESTSTUDENT'), self.student)
+        
+        with CaptureQueriesContext(connection) as queries:
+            backend.get_user_by_login('NoSuchUser')
+        fallback = queries.captured_queries[-1]['sql']
+        self.assertIn('LOWER("accounts_user"."username") =', fallback)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + fallback)
+                plan = ' '.join(str(row) for row in cursor.fetchall())
+            self.assertIn('user_username_lower_idx', plan)
+    
     def test_profile_view(self):
         """Test profile view"""
         response = self.client.get(
@@ -127,6 +199,126 @@ class UserViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, self.student.username)
     
+    def test_dashboard_stats(self):
+        """Test dashboard counters for teachers and students"""
+        from courses.models import Course, CourseCompletion
+        course = Course.objects.create(
+            title='Stats Course',
+            description='Description',
+            short_description='Short',
+            teacher=self.teacher,
+            status='published'
+        )
+        CourseCompletion.objects.create(student=self.student, course=course)
+        StatusUpdate.objects.create(user=self.student, content='Hello')
+        
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['courses_created_count'], 1)
+        self.assertEqual(response.context['total_students'], 0)
+        self.assertEqual(response.context['status_updates_count'], 0)
+        
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['courses_enrolled_count'], 0)
+        self.assertEqual(response.context['courses_completed_count'], 1)
+        self.assertEqual(response.context['status_updates_count'], 1)
+    
+    def test_dashboard_activity_refreshes_after_posting(self):
+        """Test that posting a status update clears the cached activity block"""
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'No recent activity')
+        
+        self.client.post(reverse('accounts:create_status'), {'content': 'Fresh update'})
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Fresh update')
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_create_status_update_ajax_returns_status(self):
+        """Test that AJAX posts get the new status back instead of a redirect"""
+        self.client.force_login(self.student)
+        response = self.client.post(
+            reverse('accounts:create_status'), {'content': 'Inline update'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status']['content'], 'Inline update')
+        self.assertEqual(response.json()['status']['user'], self.student.pk)
+        
+        response = self.client.post(
+            reverse('accounts:create_status'), {'content': ''},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_teacher_profile_lists_courses(self):
+        """Test that a teacher's profile lists all their courses with student counts"""
+        from courses.models import Course
+        for i in range(4):
+            Course.objects.create(
+                title=f'Profile Course {i}',
+                description='Description',
+                short_description='Short',
+                teacher=self.teacher
+            )
+        response = self.client.get(
+            reverse('accounts:profile', kwargs={'username': self.teacher.username})
+        )
+        for i in range(4):
+            self.assertContains(response, f'Profile Course {i}')
+        self.assertContains(response, '0 students', count=4)
+    
+    def test_profile_view_query_count(self):
+        """Test that viewing another user's profile stays within a fixed query budget"""
+        from courses.models import Course
+        for i in range(3):
+            Course.objects.create(
+                title=f'Course {i}',
+                description='Description',
+                short_description='Short',
+                teacher=self.teacher
+            )
+            StatusUpdate.objects.create(user=self.teacher, content=f'Update {i}')
+        self.client.force_login(self.student)
+        url = reverse('accounts:profile', kwargs={'username': self.teacher.username})
+        
+        # Session read and save (3), viewer, unread notification count,
+        # then the view's own: profile user, status updates, taught courses
+        with self.assertNumQueries(9):
+            self.client.get(url)
+    
+    def test_profile_update_saves_user_and_profile(self):
+        """Test that the edit view saves both the user and extended profile"""
+        self.client.force_login(self.student)
+        response = self.client.post(reverse('accounts:profile_edit'), {
+            'first_name': 'Updated',
+            'last_name': 'Student',
+            'email': 'student@test.com',
+            'bio': '',
+            'phone_number': '',
+            'location': '',
+            'qualification': '',
+            'website': 'https://example.com',
+            'linkedin': '',
+            'twitter': '',
+            'email_notifications': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.first_name, 'Updated')
+        self.assertEqual(self.student.profile.website, 'https://example.com')
+    
+    def test_cached_count_paginator_uses_large_estimates(self):
+        """Test that only large planner estimates replace the exact count"""
+        queryset = User.objects.order_by('pk')
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, queryset.count())
+        
+        with mock.patch.object(CachedCountPaginator, '_estimated_count', return_value=50000):
+            self.assertEqual(CachedCountPaginator(queryset, 10).count, 50000)
+        with mock.patch.object(CachedCountPaginator, '_estimated_count', return_value=500):
+            self.assertEqual(CachedCountPaginator(queryset, 10).count, queryset.count())
+    
     def test_profile_update_requires_login(self):
         """Test that profile update requires login"""
         response = self.client.get(reverse('accounts:profile_edit'))
@@ -136,12 +328,12 @@ class UserViewsTest(TestCase):
 class StatusUpdateModelTest(TestCase):
     """Test cases for StatusUpdate model"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class"""
+        cls.user = User.objects.create_user(
             username='testuser',
-            email='test@test.com',
-            password='testpass123'
+            email='test@test.com'
         )
     
     def test_create_status_update(self):
@@ -163,6 +355,65 @@ class StatusUpdateModelTest(TestCase):
         # The model's __str__ method returns content[:50] + "..."
         expected_str = f"{self.user.username}: Test content..."
         self.assertEqual(str(status), expected_str)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_recent_public_updates_load_in_one_query(self):
+        """Test recent public updates come back newest first with their authors"""
+        older = StatusUpdate.objects.create(user=self.user, content='Older')
+        newer = StatusUpdate.objects.create(user=self.user, content='Newer')
+        StatusUpdate.objects.create(user=self.user, content='Private', is_public=False)
+        
+        with self.assertNumQueries(2):
+            updates = get_recent_public_updates()
+            usernames = [update.user.username for update in updates]
+        self.assertEqual(updates, [newer, older])
+        self.assertEqual(usernames, ['testuser', 'testuser'])
+
+
+class UserProfileModelTest(TestCase):
+    """Test cases for UserProfile model"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class"""
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@test.com'
+        )
+    
+    def test_bump_view(self):
+        """Test that bump_view increments the view counter"""
+        UserProfile.bump_view(self.user.pk)
+        UserProfile.bump_view(self.user.pk)
+        self.assertEqual(UserProfile.objects.get(user=self.user).profile_views, 2)
+    
+    def test_bump_view_creates_missing_profile(self):
+        """Test that bump_view creates a profile for users without one"""
+        UserProfile.objects.filter(user=self.user).delete()
+        UserProfile.bump_view(self.user.pk)
+        self.assertEqual(UserProfile.objects.get(user=self.user).profile_views, 1)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_profile_views_are_buffered_until_flushed(self):
+        """Test that profile views reach the database only when flushed"""
+        cache.clear()
+        for _ in range(3):
+            record_profile_view(self.user.pk)
+        self.assertEqual(UserProfile.objects.get(user=self.user).profile_views, 0)
+        
+        self.assertEqual(flush_profile_views(), 3)
+        self.assertEqual(UserProfile.objects.get(user=self.user).profile_views, 3)
+        self.assertEqual(flush_profile_views(), 0)
+        
+        record_profile_view(self.user.pk)
+        self.assertEqual(flush_profile_views(), 1)
+        self.assertEqual(UserProfile.objects.get(user=self.user).profile_views, 4)
+    
+    def test_ensure_profiles_command(self):
+        """Test that ensure_profiles backfills missing profiles"""
+        UserProfile.objects.filter(user=self.user).delete()
+        call_command('ensure_profiles', stdout=StringIO())
+        self.assertTrue(UserProfile.objects.filter(user=self.user).exists())
 
 
 class UserFormsTest(TestCase):
@@ -193,7 +444,27 @@ class UserFormsTest(TestCase):
         }
         form = CustomUserCreationForm(data=form_data)
         self.assertFalse(form.is_valid())
-    
+
+    def test_user_creation_form_duplicate_email_case_insensitive(self):
+        """Test that email uniqueness ignores case"""
+        User.objects.create_user(
+            username='existing',
+            email='Test@Test.com',
+            password='testpass123'
+        )
+        form_data = {
+            'username': 'testuser',
+            'email': 'TEST@test.com',
+            'password1': 'testpass123',
+            'password2': 'testpass123',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'user_type': 'student'
+        }
+        form = CustomUserCreationForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('email', form.errors)
+
     def test_user_profile_form(self):
         """Test user profile form"""
         user = User.objects.create_user(
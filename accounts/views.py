@@ -1,21 +1,107 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import CreateView, DetailView, UpdateView, ListView
 from django.urls import reverse_lazy, reverse
-from django.db.models import Q
+from django.db import connections, transaction
+from django.db.models import QuerySet, Q, Count, OuterRef, Subquery, PositiveIntegerField
 from django.http import JsonResponse
 from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.views.decorators.cache import cache_page
+from django.utils.functional import SimpleLazyObject, cached_property
+from functools import wraps
+import hashlib
+import json
+import logging
 
-from .models import User, StatusUpdate, UserProfile
+from .models import User, StatusUpdate, UserProfile, STUDENT, TEACHER
+from .counters import record_profile_view
 from .forms import (
     CustomUserCreationForm, CustomAuthenticationForm, 
     UserProfileForm, UserProfileExtendedForm, 
     StatusUpdateForm, TeacherSearchForm
 )
 
+logger = logging.getLogger(__name__)
+
+
+class SubqueryCount(Subquery):
+    """COUNT(*) over a correlated subquery, so several counts fit in one SELECT"""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = PositiveIntegerField()
+    
+    def __init__(self, queryset, **kwargs):
+        # Default model ordering would leak into DISTINCT and skew the count
+        super().__init__(queryset.order_by(), **kwargs)
+
+
+def cache_page_for_anonymous(timeout):
+    """
+    Like cache_page, but only for anonymous visitors; authenticated users
+    always get a freshly rendered response.
+    """
+    def decorator(view_func):
+        cached_view = cache_page(timeout)(view_func)
+        
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+            return cached_view(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that keeps the (potentially expensive) total count in the cache briefly
+    
+    On PostgreSQL, result sets the planner expects to exceed
+    ``estimate_threshold`` rows are counted from the EXPLAIN estimate rather
+    than with an exact COUNT(*).
+    """
+    count_cache_timeout = 10
+    estimate_threshold = 10000
+    
+    def __init__(self, *args, count_cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+    
+    def _estimated_count(self):
+        """Row count the PostgreSQL planner expects, or None elsewhere"""
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Plan Rows']
+    
+    def _count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate > self.estimate_threshold:
+            return estimate
+        if isinstance(self.object_list, QuerySet):
+            return self.object_list.count()
+        return len(self.object_list)
+    
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return self._count()
+        return cache.get_or_set(
+            self.count_cache_key, self._count, self.count_cache_timeout
+        )
+
 
 class RegisterView(CreateView):
     """User registration view"""
@@ -47,25 +133,24 @@ def login_view(request):
     form = CustomAuthenticationForm()
     
     if request.method == 'POST':
-        form = CustomAuthenticationForm(data=request.POST)
+        form = CustomAuthenticationForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
             remember_me = form.cleaned_data.get('remember_me', False)
             
-            user = authenticate(request, username=username, password=password)
-            if user is not None:
-                login(request, user)
-                
-                # Set session expiry based on remember_me
-                if not remember_me:
-                    request.session.set_expiry(0)  # Browser close
-                
-                messages.success(request, f'Welcome back, {user.first_name}!')
-                
-                # Redirect to next or dashboard
-                next_url = request.GET.get('next', 'dashboard')
-                return redirect(next_url)
+            # The form authenticated the user while validating; reuse that
+            # instead of hashing the password a second time
+            user = form.get_user()
+            login(request, user)
+            
+            # Set session expiry based on remember_me
+            if not remember_me:
+                request.session.set_expiry(0)  # Browser close
+            
+            messages.success(request, f'Welcome back, {user.first_name}!')
+            
+            # Redirect to next or dashboard
+            next_url = request.GET.get('next', 'dashboard')
+            return redirect(next_url)
         else:
             messages.error(request, 'Invalid username or password.')
     
@@ -95,34 +180,39 @@ class ProfileView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile_user = self.get_object()
-        
-        # Get recent status updates
-        status_updates = profile_user.status_updates.filter(
-            is_public=True
-        )[:5]
+        # DetailView.get() already fetched the user; don't query for it again
+        profile_user = self.object
+        # Anonymous users have no pk, so this is False for them
+        is_own_profile = self.request.user.pk == profile_user.pk
         
-        # If viewing own profile, show all status updates
-        if self.request.user == profile_user:
+        # Get recent status updates; viewing own profile shows all of them
+        if is_own_profile:
             status_updates = profile_user.status_updates.all()[:5]
+        else:
+            status_updates = profile_user.status_updates.filter(is_public=True)[:5]
         
-        # Update profile views count if viewing someone else's profile
-        if self.request.user.is_authenticated and self.request.user != profile_user:
-            profile, created = UserProfile.objects.get_or_create(user=profile_user)
-            profile.profile_views += 1
-            profile.save()
+        # Update profile views count if viewing someone else's profile.
+        # Counted in the cache and flushed to the database periodically.
+        if self.request.user.is_authenticated and not is_own_profile:
+            record_profile_view(profile_user.pk)
         
         context.update({
             'status_updates': status_updates,
-            'is_own_profile': self.request.user == profile_user,
+            'is_own_profile': is_own_profile,
             'title': f"{profile_user.get_full_name()}'s Profile"
         })
         
         # Add course-related context for teachers and students
         if profile_user.is_teacher:
-            context['taught_courses'] = profile_user.get_courses_as_teacher()[:3]
+            # Count students in the same query instead of once per course,
+            # grouping over just the columns the course cards render
+            context['taught_courses'] = profile_user.get_courses_as_teacher().only(
+                'id', 'title', 'description', 'teacher'
+            ).annotate(
+                student_count=Count('enrollments')
+            )
         elif profile_user.is_student:
-            context['enrolled_courses'] = profile_user.get_enrolled_courses()[:3]
+            context['enrolled_courses'] = profile_user.get_enrolled_courses()
         
         return context
 
@@ -139,16 +229,18 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     def get_success_url(self):
         return reverse('accounts:profile', kwargs={'username': self.request.user.username})
     
-    def form_valid(self, form):
-        messages.success(self.request, 'Profile updated successfully!')
-        return super().form_valid(form)
+    def get_profile(self):
+        """Fetch the extended profile once per request"""
+        if not hasattr(self, '_profile'):
+            self._profile, created = UserProfile.objects.get_or_create(user=self.request.user)
+        return self._profile
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = 'Edit Profile'
         
         # Add extended profile form
-        profile, created = UserProfile.objects.get_or_create(user=self.request.user)
+        profile = self.get_profile()
         if self.request.method == 'POST':
             context['profile_form'] = UserProfileExtendedForm(
                 self.request.POST, 
@@ -159,113 +251,163 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         
         return context
     
+    @transaction.atomic
     def form_valid(self, form):
-        # Handle extended profile form
-        profile, created = UserProfile.objects.get_or_create(user=self.request.user)
-        profile_form = UserProfileExtendedForm(self.request.POST, instance=profile)
+        # Handle extended profile form; both saves commit together
+        profile_form = UserProfileExtendedForm(self.request.POST, instance=self.get_profile())
         
         if profile_form.is_valid():
             profile_form.save()
         
+        messages.success(self.request, 'Profile updated successfully!')
         return super().form_valid(form)
 
 
-@login_required
+# Recent public status updates are shared by the dashboard and home page
+RECENT_PUBLIC_UPDATES_CACHE_KEY = 'recent_public_updates:ids'
+RECENT_PUBLIC_UPDATES_CACHE_TIMEOUT = 30
+RECENT_PUBLIC_UPDATES_LIMIT = 10
+# Columns the activity feeds render; the rest of each user row is skipped
+RECENT_PUBLIC_UPDATES_FIELDS = (
+    'id', 'content', 'created_at', 'is_public',
+    'user__id', 'user__username', 'user__first_name',
+    'user__last_name', 'user__profile_picture',
+)
+
+
+def get_recent_public_updates(limit=RECENT_PUBLIC_UPDATES_LIMIT):
+    """Return recent public status updates, caching their ids briefly"""
+    recent_ids = cache.get_or_set(
+        RECENT_PUBLIC_UPDATES_CACHE_KEY,
+        lambda: list(
+            StatusUpdate.objects.filter(is_public=True)
+            .values_list('id', flat=True)[:RECENT_PUBLIC_UPDATES_LIMIT]
+        ),
+        RECENT_PUBLIC_UPDATES_CACHE_TIMEOUT
+    )[:limit]
+    updates = StatusUpdate.objects.select_related('user').only(
+        *RECENT_PUBLIC_UPDATES_FIELDS
+    ).in_bulk(recent_ids)
+    return [updates[pk] for pk in recent_ids if pk in updates]
+
+
 @login_required
 def dashboard_view(request):
     """User dashboard view"""
     user = request.user
-    print(f"DEBUG: Dashboard view called for user: {user.username}, user_type: {user.user_type}")
-    print(f"DEBUG: is_teacher: {user.is_teacher}, is_student: {user.is_student}")
+    logger.debug("Dashboard view called for user: %s, user_type: %s", user.username, user.user_type)
     
     context = {
         'user': user,
         'title': 'Dashboard'
     }
     
-    # Get recent status updates from followed users (for now, just show recent public updates)
-    recent_status_updates = StatusUpdate.objects.filter(
-        is_public=True
-    ).select_related('user')[:10]
-    
-    context['recent_status_updates'] = recent_status_updates
+    # Get recent status updates from followed users (for now, just show recent public updates).
+    # Loaded lazily so nothing is fetched unless the template renders them.
+    context['recent_status_updates'] = SimpleLazyObject(get_recent_public_updates)
     
     # Add user-specific dashboard data
-    if user.is_teacher:
-        print("DEBUG: Processing teacher dashboard")
+    is_teacher, is_student = user.is_teacher, user.is_student
+    if is_teacher:
         # Teacher dashboard data
         from courses.models import Course, Enrollment
         taught_courses = Course.objects.filter(teacher=user)
-        courses_count = taught_courses.count()
-        print(f"DEBUG: Teacher {user.username} has {courses_count} courses")
         
-        context['taught_courses'] = taught_courses[:5]
-        context['courses_created_count'] = courses_count
+        # All dashboard counters come back from a single query
+        stats = User.objects.filter(pk=user.pk).values(
+            courses_created_count=SubqueryCount(
+                Course.objects.filter(teacher=OuterRef('pk')).values('pk')
+            ),
+            # Count unique students across all courses
+            total_students=SubqueryCount(
+                Enrollment.objects.filter(
+                    course__teacher=OuterRef('pk'),
+                    is_active=True
+                ).values('student').distinct()
+            ),
+            status_updates_count=SubqueryCount(
+                StatusUpdate.objects.filter(user=OuterRef('pk')).values('pk')
+            ),
+        ).get()
+        
+        logger.debug("Teacher %s dashboard stats: %s", user.username, stats)
         
-        # Get total students across all courses (count unique students)
-        total_students = Enrollment.objects.filter(
-            course__teacher=user, 
-            is_active=True
-        ).values('student').distinct().count()
-        print(f"DEBUG: Teacher {user.username} has {total_students} total students")
-        context['total_students'] = total_students
+        context['taught_courses'] = taught_courses[:5]
+        context.update(stats)
     
-    elif user.is_student:
-        print("DEBUG: Processing student dashboard")
+    elif is_student:
         # Student dashboard data
         from courses.models import Enrollment, CourseCompletion
-        enrolled_courses = Enrollment.objects.filter(student=user, is_active=True)
-        total_enrolled = enrolled_courses.count()
-        print(f"DEBUG: Student {user.username} is enrolled in {total_enrolled} courses")
+        enrolled_courses = Enrollment.objects.filter(
+            student=user, is_active=True
+        ).select_related('course', 'course__teacher').only(
+            'id', 'course__id', 'course__title', 'course__slug', 'course__short_description',
+            'course__teacher__id', 'course__teacher__username',
+            'course__teacher__first_name', 'course__teacher__last_name',
+        )
         
-        context['enrolled_courses'] = [enrollment.course for enrollment in enrolled_courses[:5]]
+        # All dashboard counters come back from a single query
+        stats = User.objects.filter(pk=user.pk).values(
+            courses_enrolled_count=SubqueryCount(
+                Enrollment.objects.filter(student=OuterRef('pk'), is_active=True).values('pk')
+            ),
+            courses_completed_count=SubqueryCount(
+                CourseCompletion.objects.filter(student=OuterRef('pk')).values('pk')
+            ),
+            status_updates_count=SubqueryCount(
+                StatusUpdate.objects.filter(user=OuterRef('pk')).values('pk')
+            ),
+        ).get()
         
-        # Calculate completion statistics - CourseCompletion has direct student field
-        completed_courses = CourseCompletion.objects.filter(
-            student=user
-        ).count()
-        print(f"DEBUG: Student {user.username} has completed {completed_courses} courses")
+        logger.debug("Student %s dashboard stats: %s", user.username, stats)
         
-        context['courses_enrolled_count'] = total_enrolled
-        context['courses_completed_count'] = completed_courses
+        context['enrolled_courses'] = [enrollment.course for enrollment in enrolled_courses[:5]]
+        context.update(stats)
     else:
-        print(f"DEBUG: User {user.username} is neither teacher nor student")
+        logger.debug("User %s is neither teacher nor student", user.username)
         # Set default values for other user types
         context['courses_created_count'] = 0
         context['total_students'] = 0
         context['courses_enrolled_count'] = 0
         context['courses_completed_count'] = 0
-        
-    # Status updates count
-    status_count = user.status_updates.count()
-    print(f"DEBUG: User {user.username} has {status_count} status updates")
-    context['status_updates_count'] = status_count
+        context['status_updates_count'] = user.status_updates.count()
     
-    print(f"DEBUG: Final context keys: {list(context.keys())}")
     return render(request, 'dashboard.html', context)
 
 
 @login_required
 def create_status_update(request):
     """Create a new status update"""
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
     if request.method == 'POST':
         form = StatusUpdateForm(request.POST)
         if form.is_valid():
             status_update = form.save(commit=False)
             status_update.user = request.user
             status_update.save()
-            messages.success(request, 'Status update posted!')
+            # Drop the cached dashboard activity block so the new post shows up
+            cache.delete(make_template_fragment_key('dashboard_recent_activity', [request.user.pk]))
             
-            # Return JSON response for AJAX requests
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            # AJAX callers render the new update themselves, so skip the
+            # flash message and the profile page reload
+            if is_ajax:
                 return JsonResponse({
                     'success': True,
                     'message': 'Status update posted!',
-                    'redirect': reverse('accounts:profile', kwargs={'username': request.user.username})
+                    'redirect': reverse('accounts:profile', kwargs={'username': request.user.username}),
+                    'status': {
+                        'id': status_update.pk,
+                        'user': request.user.pk,
+                        'content': status_update.content,
+                        'created_at': status_update.created_at,
+                    },
                 })
             
+            messages.success(request, 'Status update posted!')
             return redirect('accounts:profile', username=request.user.username)
         else:
+            if is_ajax:
+                return JsonResponse({'success': False, 'errors': form.errors}, status=400)
             messages.error(request, 'Error posting status update.')
     
     return redirect('accounts:profile', username=request.user.username)
@@ -277,15 +419,22 @@ class UserSearchView(LoginRequiredMixin, ListView):
     template_name = 'accounts/user_search.html'
     context_object_name = 'users'
     paginate_by = 12
+    paginator_class = CachedCountPaginator
+    
+    # Columns rendered by the search results template
+    result_fields = (
+        'id', 'username', 'first_name', 'last_name', 'user_type',
+        'profile_picture', 'is_verified', 'bio', 'date_joined',
+    )
     
     def get_queryset(self):
         """Filter users based on search criteria"""
-        queryset = User.objects.filter(is_active=True).select_related('profile')
-        
         # Only teachers can search for users
         if not self.request.user.is_teacher:
             return User.objects.none()
         
+        queryset = User.objects.filter(is_active=True).only(*self.result_fields)
+        
         form = TeacherSearchForm(self.request.GET)
         if form.is_valid():
             search_query = form.cleaned_data.get('search_query')
@@ -311,6 +460,14 @@ class UserSearchView(LoginRequiredMixin, ListView):
         
         return queryset.order_by('-date_joined')
     
+    def get_paginator(self, queryset, per_page, **kwargs):
+        # Reuse the result count while the same search is paged through
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        digest = hashlib.md5(params.urlencode().encode()).hexdigest()
+        kwargs['count_cache_key'] = f'usersearch:count:{self.request.user.pk}:{digest}'
+        return super().get_paginator(queryset, per_page, **kwargs)
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_form'] = TeacherSearchForm(self.request.GET)
@@ -318,6 +475,27 @@ class UserSearchView(LoginRequiredMixin, ListView):
         return context
 
 
+# Home page statistics change slowly, so short-lived cache entries are fine
+HOME_TOTALS_CACHE_KEY = 'home:totals'
+HOME_TOTALS_CACHE_TIMEOUT = 60
+
+
+def _home_totals():
+    """Count active users per type with a single grouped query"""
+    counts = dict(
+        User.objects.filter(is_active=True)
+        .order_by()
+        .values_list('user_type')
+        .annotate(count=Count('id'))
+    )
+    return {
+        'total_users': sum(counts.values()),
+        'total_teachers': counts.get(TEACHER, 0),
+        'total_students': counts.get(STUDENT, 0),
+    }
+
+
+@cache_page_for_anonymous(60 * 5)
 def home_view(request):
     """Home page view"""
     context = {
@@ -325,13 +503,11 @@ def home_view(request):
     }
     
     # Show some statistics
-    context['total_users'] = User.objects.filter(is_active=True).count()
-    context['total_teachers'] = User.objects.filter(user_type='teacher', is_active=True).count()
-    context['total_students'] = User.objects.filter(user_type='student', is_active=True).count()
+    context.update(cache.get_or_set(
+        HOME_TOTALS_CACHE_KEY, _home_totals, HOME_TOTALS_CACHE_TIMEOUT
+    ))
     
     # Show recent public status updates
-    context['recent_updates'] = StatusUpdate.objects.filter(
-        is_public=True
-    ).select_related('user')[:5]
+    context['recent_updates'] = get_recent_public_updates(limit=5)
     
     return render(request, 'home.html', context)
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.fields.files import FieldFile
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+TOKEN_CACHE_KEY = 'api:token:{}'
+TOKEN_CACHE_TIMEOUT = 60
+
+
+def cached_user_fields():
+    """User columns kept in the token cache: all but the password hash"""
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.attname != 'password'
+    ]
+
+
+def remember_token(token):
+    """Put a token's user, without the password hash, in the authentication cache"""
+    values = []
+    for attname in cached_user_fields():
+        value = getattr(token.user, attname)
+        values.append(value.name if isinstance(value, FieldFile) else value)
+    cache.set(TOKEN_CACHE_KEY.format(token.key), values, TOKEN_CACHE_TIMEOUT)
+
+
+def forget_token(key):
+    """Drop a token from the authentication cache"""
+    cache.delete(TOKEN_CACHE_KEY.format(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps recently used tokens' users in the
+    cache, without their password hashes, so repeat requests skip the token
+    lookup query.
+    
+    Cached entries are dropped when the token is deleted or its user is
+    saved (see api/signals.py), so logouts and deactivations apply at once.
+    """
+    
+    def authenticate_credentials(self, key):
+        values = cache.get(TOKEN_CACHE_KEY.format(key))
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            remember_token(token)
+            return user, token
+        
+        # The password hash is deferred and only loaded if something asks for it
+        user = get_user_model().from_db(DEFAULT_DB_ALIAS, cached_user_fields(), values)
+        return user, Token(key=key, user=user)
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+RESPONSE_CACHE_KEY = 'api:response:{}:{}'
+RESPONSE_CACHE_VERSION_KEY = 'api:response-version:{}'
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+
+def bump_response_cache(model):
+    """Invalidate every cached response that renders ``model``"""
+    key = RESPONSE_CACHE_VERSION_KEY.format(model._meta.label_lower)
+    cache.add(key, 0, None)
+    cache.incr(key)
+
+
+class CachedResponseMixin:
+    """
+    Serve read responses from the cache until one of ``cache_models``
+    changes (see api/signals.py), so repeat reads skip the database and the
+    serializers entirely.
+    
+    Only use it on views that render the same data for every caller.
+    """
+    cache_models = ()
+    
+    def get_response_cache_key(self, request):
+        version_keys = [
+            RESPONSE_CACHE_VERSION_KEY.format(model._meta.label_lower)
+            for model in self.cache_models
+        ]
+        versions = cache.get_many(version_keys)
+        # The absolute URL covers the lookup, the filters and the pagination links
+        url = request.build_absolute_uri()
+        signature = ':'.join([url] + [str(versions.get(key, 0)) for key in version_keys])
+        return RESPONSE_CACHE_KEY.format(
+            type(self).__name__, hashlib.md5(signature.encode()).hexdigest()
+        )
+    
+    def get_cached_response(self, request, render):
+        cache_key = self.get_response_cache_key(request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+        response = render()
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    """Cache the responses of ``list``"""
+    
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, lambda: super(CachedListMixin, self).list(request, *args, **kwargs)
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    """Cache the responses of ``retrieve``"""
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            request, lambda: super(CachedRetrieveMixin, self).retrieve(request, *args, **kwargs)
+        )
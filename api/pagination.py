@@ -0,0 +1,10 @@
+from rest_framework.pagination import PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Page number pagination that lets clients pick a smaller or larger page
+    with ``?page_size=``, capped so one request never serializes a whole table.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
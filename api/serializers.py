@@ -6,7 +6,25 @@ from courses.models import Course, CourseMaterial, Enrollment, Feedback, Notific
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class SharedRepresentationMixin:
+    """Render each instance once per response
+    
+    A user or course nested under many rows (the teacher of every course,
+    the course of every enrollment) is serialized the first time it appears;
+    later rows reuse that representation from a cache on the root serializer.
+    """
+    
+    def to_representation(self, instance):
+        if instance.pk is None:
+            return super().to_representation(instance)
+        representations = self.root.__dict__.setdefault('_shared_representations', {})
+        key = (id(self), instance.pk)
+        if key not in representations:
+            representations[key] = super().to_representation(instance)
+        return representations[key]
+
+
+class UserSerializer(SharedRepresentationMixin, serializers.ModelSerializer):
     """Serializer for User model"""
     class Meta:
         model = User
@@ -17,9 +35,47 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserListSerializer(serializers.ModelSerializer):
+    """Lightweight User serializer for list endpoints"""
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'profile_picture']
+        read_only_fields = fields
+
+
+# Query parameter value that expands every user relation at once
+EXPAND_ALL_USERS = 'user'
+
+
+def get_expanded_fields(request):
+    """Return the relation names listed in the request's ``?expand=`` param"""
+    if request is None:
+        return set()
+    expand = request.query_params.get('expand', '')
+    return {name.strip() for name in expand.split(',') if name.strip()}
+
+
+class ExpandableUserFieldsMixin:
+    """Render user relations as primary keys unless the request expands them
+    
+    ``?expand=user`` nests every field listed in ``expandable_user_fields``;
+    ``?expand=<field>`` nests just that one.
+    """
+    expandable_user_fields = ()
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        expanded = get_expanded_fields(self.context.get('request'))
+        for name in self.expandable_user_fields:
+            if EXPAND_ALL_USERS in expanded or name in expanded:
+                fields[name] = UserSerializer(read_only=True)
+        return fields
+
+
+class UserProfileSerializer(ExpandableUserFieldsMixin, serializers.ModelSerializer):
     """Serializer for UserProfile model"""
-    user = UserSerializer(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_user_fields = ('user',)
     
     class Meta:
         model = UserProfile
@@ -30,9 +86,10 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at', 'last_activity', 'profile_views']
 
 
-class StatusUpdateSerializer(serializers.ModelSerializer):
+class StatusUpdateSerializer(ExpandableUserFieldsMixin, serializers.ModelSerializer):
     """Serializer for StatusUpdate model"""
-    user = UserSerializer(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_user_fields = ('user',)
     
     class Meta:
         model = StatusUpdate
@@ -40,9 +97,10 @@ class StatusUpdateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SharedRepresentationMixin, ExpandableUserFieldsMixin, serializers.ModelSerializer):
     """Serializer for Course model"""
-    teacher = UserSerializer(read_only=True)
+    teacher = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_user_fields = ('teacher',)
     enrollment_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -53,7 +111,11 @@ class CourseSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'enrollment_count']
     
     def get_enrollment_count(self, obj):
-        return obj.enrollments.count()
+        # Course views annotate the count; nested courses fall back to a query
+        total = getattr(obj, 'enrollments_total', None)
+        if total is None:
+            return obj.enrollments.count()
+        return total
 
 
 class CourseMaterialSerializer(serializers.ModelSerializer):
@@ -67,9 +129,10 @@ class CourseMaterialSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class EnrollmentSerializer(serializers.ModelSerializer):
+class EnrollmentSerializer(ExpandableUserFieldsMixin, serializers.ModelSerializer):
     """Serializer for Enrollment model"""
-    student = UserSerializer(read_only=True)
+    student = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_user_fields = ('student',)
     course = CourseSerializer(read_only=True)
     
     class Meta:
@@ -79,9 +142,10 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_enrolled']
 
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(ExpandableUserFieldsMixin, serializers.ModelSerializer):
     """Serializer for Feedback model"""
-    student = UserSerializer(read_only=True)
+    student = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_user_fields = ('student',)
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
     
     class Meta:
@@ -91,10 +155,11 @@ class FeedbackSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'helpful_votes']
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(ExpandableUserFieldsMixin, serializers.ModelSerializer):
     """Serializer for Notification model"""
-    recipient = UserSerializer(read_only=True)
-    sender = UserSerializer(read_only=True)
+    recipient = serializers.PrimaryKeyRelatedField(read_only=True)
+    sender = serializers.PrimaryKeyRelatedField(read_only=True)
+    expandable_user_fields = ('recipient', 'sender')
     
     class Meta:
         model = Notification
@@ -120,8 +185,5 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # create_user hashes the password before its single INSERT
+        return User.objects.create_user(**validated_data)
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from courses.models import Course, Enrollment
+from .authentication import forget_token
+from .caching import bump_response_cache
+
+User = get_user_model()
+
+
+def is_login_save(update_fields):
+    """Whether a User save only records a login (see update_last_login)"""
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """
+    Stop accepting a token as soon as it is deleted (e.g. on logout)
+    """
+    forget_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Refresh the cached user behind a token when the user changes
+    """
+    # A login's last_login save does not change how the user authenticates
+    if not created and not is_login_save(update_fields):
+        for key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+            forget_token(key)
+
+
+# Only model saves and deletes invalidate cached responses: queryset
+# ``.update()`` and ``bulk_create`` writes bypass these signals, so code that
+# changes rendered fields that way must call bump_response_cache itself.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_cached_responses(sender, update_fields=None, **kwargs):
+    """
+    Drop cached responses that render the changed model
+    """
+    # last_login is not rendered, and every login saves it
+    if is_login_save(update_fields):
+        return
+    bump_response_cache(sender)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_cached_enrollment_counts(sender, created=True, **kwargs):
+    """
+    Drop cached responses when a course's enrollment count changes
+    """
+    # Only adding or removing an enrollment changes enrollment_count;
+    # progress and status updates do not
+    if created:
+        bump_response_cache(sender)
@@ -1,7 +1,11 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.urls import reverse, reverse_lazy
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.request import Request
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from accounts.models import UserProfile, StatusUpdate
@@ -10,20 +14,105 @@ from .serializers import (
     UserSerializer, CourseSerializer, EnrollmentSerializer, 
     FeedbackSerializer, NotificationSerializer
 )
+from .authentication import TOKEN_CACHE_KEY
 from decimal import Decimal
 
 User = get_user_model()
 
+# Fixture password, hashed once so bulk-created users can still log in
+TEST_PASSWORD_HASH = make_password('testpass123')
+
+# Endpoints without URL arguments, resolved once for the whole module
+REGISTER_URL = reverse_lazy('api:register')
+LOGIN_URL = reverse_lazy('api:login')
+LOGOUT_URL = reverse_lazy('api:logout')
+USER_LIST_URL = reverse_lazy('api:user-list')
+COURSE_LIST_URL = reverse_lazy('api:course-list')
+ENROLLMENT_LIST_URL = reverse_lazy('api:enrollment-list')
+FEEDBACK_LIST_URL = reverse_lazy('api:feedback-list')
+NOTIFICATION_LIST_URL = reverse_lazy('api:notification-list')
+
+# Field contracts of the serializers
+EXPECTED_USER_FIELDS = frozenset({
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'user_type', 'bio', 'profile_picture', 'phone_number', 'location',
+    'qualification', 'experience_years', 'is_verified',
+    'date_joined', 'is_active',
+})
+EXPECTED_COURSE_FIELDS = frozenset({
+    'id', 'title', 'description', 'short_description', 'teacher',
+    'category', 'difficulty_level', 'price', 'is_free', 'max_students',
+    'created_at', 'updated_at', 'status', 'enrollment_count',
+})
+
+
+def create_users(user_type, count):
+    """Insert ``count`` users of one type in a single query"""
+    return User.objects.bulk_create([
+        User(
+            username=f'{user_type}{i}',
+            email=f'{user_type}{i}@test.com',
+            password=TEST_PASSWORD_HASH,
+            user_type=user_type
+        )
+        for i in range(count)
+    ])
+
+
+def create_courses(teachers):
+    """Insert one published course per teacher in a single query"""
+    return Course.objects.bulk_create([
+        Course(
+            title=f'Course {i}',
+            slug=f'course-{i}',
+            description='Test description',
+            teacher=teacher,
+            status='published'
+        )
+        for i, teacher in enumerate(teachers)
+    ])
+
+
+def create_tokens(*users):
+    """Insert API tokens for ``users`` in a single query"""
+    return Token.objects.bulk_create([
+        Token(user=user, key=Token.generate_key()) for user in users
+    ])
+
+
+class TeacherStudentCourseMixin:
+    """Shared fixtures: a teacher, a student, a published course and their tokens"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class"""
+        super().setUpTestData()
+        cls.teacher = User.objects.create_user(
+            username='teacher',
+            email='teacher@test.com',
+            password='testpass123',
+            user_type='teacher'
+        )
+        cls.student = User.objects.create_user(
+            username='student',
+            email='student@test.com',
+            password='testpass123',
+            user_type='student'
+        )
+        cls.course = Course.objects.create(
+            title='Test Course',
+            description='Test description',
+            teacher=cls.teacher,
+            status='published'
+        )
+        cls.teacher_token, cls.student_token = create_tokens(cls.teacher, cls.student)
+
 
 class APIAuthenticationTest(APITestCase):
     """Test API authentication endpoints"""
     
     def setUp(self):
         """Set up test data"""
-        self.register_url = reverse('api:register')
-        self.login_url = reverse('api:login')
-        self.logout_url = reverse('api:logout')
-        
         self.user_data = {
             'username': 'testuser',
             'email': 'test@test.com',
@@ -36,17 +125,25 @@ class APIAuthenticationTest(APITestCase):
     
     def test_user_registration(self):
         """Test user registration via API"""
-        response = self.client.post(self.register_url, self.user_data)
+        response = self.client.post(REGISTER_URL, self.user_data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('token', response.data)
         self.assertIn('user', response.data)
         self.assertTrue(User.objects.filter(username='testuser').exists())
     
+    def test_user_registration_hashes_password(self):
+        """Test registration stores a usable hashed password"""
+        response = self.client.post(REGISTER_URL, self.user_data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(username='testuser')
+        self.assertNotEqual(user.password, 'testpass123')
+        self.assertTrue(user.check_password('testpass123'))
+    
     def test_user_registration_invalid_data(self):
         """Test user registration with invalid data"""
         invalid_data = self.user_data.copy()
         invalid_data['email'] = 'invalid-email'
-        response = self.client.post(self.register_url, invalid_data)
+        response = self.client.post(REGISTER_URL, invalid_data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
     
     def test_user_login(self):
@@ -62,23 +159,81 @@ class APIAuthenticationTest(APITestCase):
             'username': 'testuser',
             'password': 'testpass123'
         }
-        response = self.client.post(self.login_url, login_data)
-        if response.status_code != status.HTTP_200_OK:
-            print(f"Login failed with status {response.status_code}")
-            print(f"Response data: {response.data}")
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(LOGIN_URL, login_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, msg=response.data)
         self.assertIn('token', response.data)
         self.assertIn('user', response.data)
     
+    def test_login_warms_token_cache(self):
+        """Test the first request after logging in skips the token lookup"""
+        cache.clear()
+        User.objects.create_user(
+            username='testuser',
+            email='test@test.com',
+            password='testpass123'
+        )
+        response = self.client.post(LOGIN_URL, {'username': 'testuser', 'password': 'testpass123'})
+        
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + response.data['token'])
+        # Page count only; an empty page needs no row query
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api:status-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
     def test_user_login_invalid_credentials(self):
         """Test user login with invalid credentials"""
         login_data = {
             'username': 'nonexistent',
             'password': 'wrongpass'
         }
-        response = self.client.post(self.login_url, login_data)
+        response = self.client.post(LOGIN_URL, login_data)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_token_is_cached_until_logout(self):
+        """Test repeat requests skip the token lookup until the token is deleted"""
+        cache.clear()
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@test.com',
+            password='testpass123'
+        )
+        token, = create_tokens(user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        
+        StatusUpdate.objects.create(user=user, content='Hello')
+        url = reverse('api:status-list')
+        self.client.get(url)
+        # Page count and page rows
+        with self.assertNumQueries(2):
+            self.client.get(url)
+        
+        self.client.post(LOGOUT_URL)
+        response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
     
+    def test_token_cache_survives_logins_without_password_hash(self):
+        """Test logins keep the cached token and the cache holds no password hash"""
+        cache.clear()
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@test.com',
+            password='testpass123'
+        )
+        token, = create_tokens(user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        url = reverse('api:status-list')
+        self.client.get(url)
+        
+        # Only the last_login UPDATE; no token lookup to invalidate the cache
+        with self.assertNumQueries(1):
+            update_last_login(None, user)
+        self.assertNotIn(user.password, str(cache.get(TOKEN_CACHE_KEY.format(token.key))))
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user, user)
+    
     def test_user_logout(self):
         """Test user logout via API"""
         # Create user and get token
@@ -92,7 +247,7 @@ class APIAuthenticationTest(APITestCase):
         # Set authentication
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
         
-        response = self.client.post(self.logout_url)
+        response = self.client.post(LOGOUT_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # Token should be deleted
@@ -102,23 +257,46 @@ class APIAuthenticationTest(APITestCase):
 class UserAPITest(APITestCase):
     """Test User API endpoints"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class"""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@test.com',
             password='testpass123',
             user_type='student'
         )
-        self.token = Token.objects.create(user=self.user)
+        cls.token, = create_tokens(cls.user)
+    
+    def setUp(self):
+        """Authenticate the test client with a cold token cache"""
+        cache.clear()
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
     
     def test_get_user_list(self):
         """Test getting user list"""
-        url = reverse('api:user-list')
+        url = USER_LIST_URL
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['count'], 1)
+        self.assertNotIn('bio', response.data['results'][0])
+    
+    def test_user_list_page_size_is_capped(self):
+        """Test ?page_size= picks the page size up to the maximum"""
+        create_users('student', 120)
+        response = self.client.get(USER_LIST_URL, {'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+        response = self.client.get(USER_LIST_URL, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(response.data['count'], 121)
+    
+    def test_get_user_list_reads_no_deferred_fields(self):
+        """Test the projected user list never refetches a deferred column"""
+        create_users('student', 5)
+        # Token lookup, page count and page rows
+        with self.assertNumQueries(3):
+            response = self.client.get(USER_LIST_URL, {'search': 'student'})
+        self.assertEqual(response.data['count'], 5)
     
     def test_get_user_detail(self):
         """Test getting user detail"""
@@ -140,40 +318,19 @@ class UserAPITest(APITestCase):
         self.assertEqual(self.user.first_name, 'Updated')
 
 
-class CourseAPITest(APITestCase):
+class CourseAPITest(TeacherStudentCourseMixin, APITestCase):
     """Test Course API endpoints"""
     
     def setUp(self):
-        """Set up test data"""
-        self.teacher = User.objects.create_user(
-            username='teacher',
-            email='teacher@test.com',
-            password='testpass123',
-            user_type='teacher'
-        )
-        self.student = User.objects.create_user(
-            username='student',
-            email='student@test.com',
-            password='testpass123',
-            user_type='student'
-        )
-        self.course = Course.objects.create(
-            title='Test Course',
-            description='Test description',
-            teacher=self.teacher,
-            status='published'
-        )
-        
-        # Create tokens
-        self.teacher_token = Token.objects.create(user=self.teacher)
-        self.student_token = Token.objects.create(user=self.student)
+        """Start every test with an empty list cache"""
+        cache.clear()
     
     def test_get_course_list(self):
         """Test getting course list"""
-        url = reverse('api:course-list')
+        url = COURSE_LIST_URL
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['count'], 1)
     
     def test_get_course_detail(self):
         """Test getting course detail"""
@@ -182,11 +339,72 @@ class CourseAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], 'Test Course')
     
+    def test_get_course_list_query_count(self):
+        """Test the course list query count does not grow with the page"""
+        create_courses(create_users('teacher', 5))
+        url = COURSE_LIST_URL
+        # Page count and page rows; teachers and enrollment counts add none
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(response.data['results'][0]['enrollment_count'], 0)
+    
+    def test_course_list_is_cached_until_a_course_changes(self):
+        """Test repeat course list reads are served from the cache"""
+        self.client.get(COURSE_LIST_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(COURSE_LIST_URL)
+        self.assertEqual(response.data['results'][0]['title'], 'Test Course')
+        
+        self.course.title = 'Renamed Course'
+        self.course.save()
+        response = self.client.get(COURSE_LIST_URL)
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed Course')
+    
+    def test_course_list_survives_logins_and_progress_updates(self):
+        """Test logins and enrollment progress do not drop cached responses"""
+        Enrollment.objects.bulk_create([Enrollment(student=self.student, course=self.course)])
+        self.client.get(COURSE_LIST_URL)
+        
+        update_last_login(None, self.teacher)
+        enrollment = Enrollment.objects.get(student=self.student)
+        enrollment.progress = 50
+        enrollment.save()
+        with self.assertNumQueries(0):
+            response = self.client.get(COURSE_LIST_URL)
+        self.assertEqual(response.data['results'][0]['enrollment_count'], 1)
+        
+        enrollment.delete()
+        response = self.client.get(COURSE_LIST_URL)
+        self.assertEqual(response.data['results'][0]['enrollment_count'], 0)
+    
+    def test_course_detail_is_cached_until_its_teacher_changes(self):
+        """Test repeat course detail reads are served from the cache"""
+        url = reverse('api:course-detail', kwargs={'pk': self.course.pk})
+        self.client.get(url, {'expand': 'teacher'})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'expand': 'teacher'})
+        self.assertEqual(response.data['teacher']['first_name'], '')
+        
+        self.teacher.first_name = 'Ada'
+        self.teacher.save()
+        response = self.client.get(url, {'expand': 'teacher'})
+        self.assertEqual(response.data['teacher']['first_name'], 'Ada')
+    
+    def test_get_course_list_expand_teacher(self):
+        """Test the teacher is a primary key unless expanded"""
+        url = COURSE_LIST_URL
+        response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['teacher'], self.teacher.pk)
+        
+        response = self.client.get(url, {'expand': 'teacher'})
+        self.assertEqual(response.data['results'][0]['teacher']['username'], 'teacher')
+    
     def test_create_course_as_teacher(self):
         """Test creating course as teacher"""
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.teacher_token.key)
         
-        url = reverse('api:course-list')
+        url = COURSE_LIST_URL
         data = {
             'title': 'New Course',
             'description': 'New course description',
@@ -199,17 +417,14 @@ class CourseAPITest(APITestCase):
             'status': 'published'
         }
         response = self.client.post(url, data)
-        if response.status_code != status.HTTP_201_CREATED:
-            print(f"Course creation failed with status {response.status_code}")
-            print(f"Response data: {response.data}")
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, msg=response.data)
         self.assertTrue(Course.objects.filter(title='New Course').exists())
     
     def test_create_course_as_student_forbidden(self):
         """Test that students cannot create courses"""
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
         
-        url = reverse('api:course-list')
+        url = COURSE_LIST_URL
         data = {
             'title': 'New Course',
             'description': 'New course description'
@@ -227,84 +442,115 @@ class CourseAPITest(APITestCase):
         self.assertTrue(
             Enrollment.objects.filter(student=self.student, course=self.course).exists()
         )
+    
+    def test_course_material_list(self):
+        """Test listing the materials of one course"""
+        other_course, = create_courses([self.teacher])
+        # bulk_create skips the new material notification signals
+        CourseMaterial.objects.bulk_create([
+            CourseMaterial(course=course, title=f'Week {i}', material_type='pdf')
+            for i, course in enumerate([self.course, self.course, other_course])
+        ])
+        
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
+        url = reverse('api:material-list')
+        # Token lookup, course filter lookup, page count and page rows
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'course': self.course.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['results'][0]['course'], self.course.pk)
 
 
-class EnrollmentAPITest(APITestCase):
+class EnrollmentAPITest(TeacherStudentCourseMixin, APITestCase):
     """Test Enrollment API endpoints"""
     
+    @classmethod
+    def setUpTestData(cls):
+        """Add an enrollment to the shared fixtures"""
+        super().setUpTestData()
+        # bulk_create skips the enrollment notification signals
+        cls.enrollment, = Enrollment.objects.bulk_create([Enrollment(
+            student=cls.student,
+            course=cls.course
+        )])
+    
     def setUp(self):
-        """Set up test data"""
-        self.teacher = User.objects.create_user(
-            username='teacher',
-            email='teacher@test.com',
-            password='testpass123',
-            user_type='teacher'
-        )
-        self.student = User.objects.create_user(
-            username='student',
-            email='student@test.com',
-            password='testpass123',
-            user_type='student'
-        )
-        self.course = Course.objects.create(
-            title='Test Course',
-            description='Test description',
-            teacher=self.teacher,
-            status='published'
-        )
-        self.enrollment = Enrollment.objects.create(
-            student=self.student,
-            course=self.course
-        )
-        
-        self.student_token = Token.objects.create(user=self.student)
+        """Authenticate the test client with a cold token cache"""
+        cache.clear()
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
     
     def test_get_student_enrollments(self):
         """Test getting student's enrollments"""
-        url = reverse('api:enrollment-list')
+        url = ENROLLMENT_LIST_URL
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_enrollment_list_is_not_n_plus_1(self):
+        """Test listing enrollments takes a constant number of queries"""
+        courses = create_courses([self.teacher] * 20)
+        Enrollment.objects.bulk_create([
+            Enrollment(student=self.student, course=course) for course in courses
+        ])
+        
+        url = ENROLLMENT_LIST_URL
+        # Token lookup, page count, page rows and their courses
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['course']['enrollment_count'], 1)
+        
+        # The token is cached now, so only the page queries remain
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'expand': 'user'})
+        self.assertEqual(response.data['results'][0]['student']['username'], 'student')
+        self.assertEqual(response.data['results'][0]['course']['teacher']['username'], 'teacher')
+    
+    def test_teacher_enrollment_list_is_not_n_plus_1(self):
+        """Test a teacher's enrollment list takes a constant number of queries"""
+        Enrollment.objects.bulk_create([
+            Enrollment(student=student, course=self.course)
+            for student in create_users('student', 19)
+        ])
+        
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.teacher_token.key)
+        # Token lookup, page count, page rows and their course
+        with self.assertNumQueries(4):
+            response = self.client.get(ENROLLMENT_LIST_URL, {'expand': 'user'})
+        self.assertEqual(response.data['count'], 20)
+        self.assertEqual(response.data['results'][0]['course']['enrollment_count'], 20)
+    
+    def test_enroll_again_is_a_single_lookup(self):
+        """Test enrolling in a course twice only looks the enrollment up"""
+        url = reverse('api:course-enroll', kwargs={'course_id': self.course.pk})
+        # Token lookup, course and existing enrollment
+        with self.assertNumQueries(3):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], 'Already enrolled in this course')
     
     def test_get_enrollment_detail(self):
         """Test getting enrollment detail"""
         url = reverse('api:enrollment-detail', kwargs={'pk': self.enrollment.pk})
-        response = self.client.get(url)
+        # Token lookup, enrollment, and its course with the enrollment count
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['course']['title'], 'Test Course')
 
 
-class FeedbackAPITest(APITestCase):
+class FeedbackAPITest(TeacherStudentCourseMixin, APITestCase):
     """Test Feedback API endpoints"""
     
     def setUp(self):
-        """Set up test data"""
-        self.teacher = User.objects.create_user(
-            username='teacher',
-            email='teacher@test.com',
-            password='testpass123',
-            user_type='teacher'
-        )
-        self.student = User.objects.create_user(
-            username='student',
-            email='student@test.com',
-            password='testpass123',
-            user_type='student'
-        )
-        self.course = Course.objects.create(
-            title='Test Course',
-            description='Test description',
-            teacher=self.teacher,
-            status='published'
-        )
-        
-        self.student_token = Token.objects.create(user=self.student)
+        """Authenticate the test client with a cold token cache"""
+        cache.clear()
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
     
     def test_create_feedback(self):
         """Test creating course feedback via API"""
-        url = reverse('api:feedback-list')
+        url = FEEDBACK_LIST_URL
         data = {
             'course': self.course.pk,
             'rating': 5,
@@ -328,91 +574,175 @@ class FeedbackAPITest(APITestCase):
             content='Nice course content'
         )
         
-        url = reverse('api:feedback-list')
-        response = self.client.get(url)
+        for i in range(2):
+            Feedback.objects.create(
+                course=self.course,
+                student=User.objects.create_user(
+                    username=f'student{i}',
+                    email=f'student{i}@test.com',
+                    user_type='student'
+                ),
+                rating=5,
+                title='Great Course',
+                content='Loved it'
+            )
+        
+        url = FEEDBACK_LIST_URL
+        # Token lookup, page count and page rows
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['count'], 3)
+        
+        # Course filter lookup, page count and page rows with the students joined
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'expand': 'student', 'course': self.course.pk})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            {feedback['student']['username'] for feedback in response.data['results']},
+            {'student', 'student0', 'student1'}
+        )
 
 
-class APISerializerTest(TestCase):
-    """Test API serializers"""
+class NotificationAPITest(TeacherStudentCourseMixin, APITestCase):
+    """Test Notification API endpoints"""
     
     def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
+        """Authenticate the test client with a cold token cache"""
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
+    
+    def test_notification_list_is_not_n_plus_1(self):
+        """Test listing notifications takes a constant number of queries"""
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=self.student,
+                sender=self.teacher,
+                title=f'Announcement {i}',
+                message='Class is cancelled',
+                course=self.course
+            )
+            for i in range(5)
+        ])
+        Notification.objects.create(recipient=self.teacher, title='Not yours', message='Hidden')
+        
+        # Token lookup, page count and page rows with both users joined
+        with self.assertNumQueries(3):
+            response = self.client.get(NOTIFICATION_LIST_URL, {'expand': 'user'})
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['results'][0]['sender']['username'], 'teacher')
+        self.assertEqual(response.data['results'][0]['course'], self.course.pk)
+    
+    def test_mark_notification_read(self):
+        """Test marking a notification read takes a single UPDATE"""
+        notification = Notification.objects.create(
+            recipient=self.student, title='Hello', message='Welcome'
+        )
+        others = Notification.objects.create(
+            recipient=self.teacher, title='Hello', message='Not yours'
+        )
+        
+        url = reverse('api:notification-mark-read', kwargs={'pk': notification.pk})
+        # Token lookup and the update
+        with self.assertNumQueries(2):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        notification.refresh_from_db()
+        self.assertTrue(notification.is_read)
+        
+        url = reverse('api:notification-mark-read', kwargs={'pk': others.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        others.refresh_from_db()
+        self.assertFalse(others.is_read)
+
+
+class APISerializerTest(TestCase):
+    """Test API serializers without going through the HTTP stack"""
+    
+    factory = APIRequestFactory()
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the whole class"""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@test.com',
             password='testpass123',
             user_type='teacher'
         )
-        self.course = Course.objects.create(
+        cls.student = User.objects.create_user(
+            username='student',
+            email='student@test.com',
+            password='testpass123',
+            user_type='student'
+        )
+        cls.course = Course.objects.create(
             title='Test Course',
             description='Test description',
-            teacher=self.user
+            teacher=cls.user
         )
     
     def test_user_serializer(self):
         """Test UserSerializer"""
         serializer = UserSerializer(self.user)
-        expected_fields = ['id', 'username', 'email', 'first_name', 'last_name', 
-                          'user_type', 'bio', 'profile_picture', 'phone_number', 'location',
-                          'qualification', 'experience_years', 'is_verified',
-                          'date_joined', 'is_active']
-        self.assertEqual(set(serializer.data.keys()), set(expected_fields))
+        self.assertEqual(serializer.data.keys(), EXPECTED_USER_FIELDS)
     
     def test_course_serializer(self):
         """Test CourseSerializer"""
         serializer = CourseSerializer(self.course)
-        expected_fields = ['id', 'title', 'description', 'short_description', 'teacher', 
-                          'category', 'difficulty_level', 'price', 'is_free', 'max_students',
-                          'created_at', 'updated_at', 'status', 'enrollment_count']
-        self.assertEqual(set(serializer.data.keys()), set(expected_fields))
+        self.assertEqual(serializer.data.keys(), EXPECTED_COURSE_FIELDS)
         self.assertEqual(serializer.data['title'], 'Test Course')
     
     def test_enrollment_serializer(self):
         """Test EnrollmentSerializer"""
-        student = User.objects.create_user(
-            username='student',
-            email='student@test.com',
-            password='testpass123',
-            user_type='student'
-        )
-        enrollment = Enrollment.objects.create(
-            student=student,
+        # bulk_create skips the enrollment notification signals
+        enrollment, = Enrollment.objects.bulk_create([Enrollment(
+            student=self.student,
             course=self.course
-        )
+        )])
         
         serializer = EnrollmentSerializer(enrollment)
-        self.assertEqual(serializer.data['student']['username'], 'student')
+        self.assertEqual(serializer.data['student'], self.student.pk)
         self.assertEqual(serializer.data['course']['title'], 'Test Course')
+        self.assertEqual(serializer.data['course']['teacher'], self.user.pk)
+    
+    def test_nested_course_is_serialized_once(self):
+        """Test enrollments of one course share its representation"""
+        enrollments = Enrollment.objects.bulk_create([
+            Enrollment(student=student, course=self.course)
+            for student in [self.student, self.user]
+        ])
+        
+        data = EnrollmentSerializer(enrollments, many=True).data
+        self.assertIs(data[0]['course'], data[1]['course'])
+        self.assertEqual(data[1]['course']['title'], 'Test Course')
+    
+    def test_notification_serializer_expand_user(self):
+        """Test ?expand=user nests the user relations"""
+        notification = Notification.objects.create(
+            recipient=self.student,
+            sender=self.user,
+            title='Hello',
+            message='Welcome to the course'
+        )
+        
+        serializer = NotificationSerializer(notification)
+        self.assertEqual(serializer.data['recipient'], self.student.pk)
+        self.assertEqual(serializer.data['sender'], self.user.pk)
+        
+        request = Request(self.factory.get('/', {'expand': 'user'}))
+        serializer = NotificationSerializer(notification, context={'request': request})
+        self.assertEqual(serializer.data['recipient']['username'], 'student')
+        self.assertEqual(serializer.data['sender']['username'], 'testuser')
 
 
-class APIPermissionTest(APITestCase):
+class APIPermissionTest(TeacherStudentCourseMixin, APITestCase):
     """Test API permissions"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.teacher = User.objects.create_user(
-            username='teacher',
-            email='teacher@test.com',
-            password='testpass123',
-            user_type='teacher'
-        )
-        self.student = User.objects.create_user(
-            username='student',
-            email='student@test.com',
-            password='testpass123',
-            user_type='student'
-        )
-        self.course = Course.objects.create(
-            title='Test Course',
-            description='Test description',
-            teacher=self.teacher
-        )
-    
     def test_unauthenticated_access(self):
         """Test unauthenticated access to protected endpoints"""
-        url = reverse('api:course-list')
+        url = COURSE_LIST_URL
         
         # GET should work (read-only)
         response = self.client.get(url)
@@ -425,8 +755,7 @@ class APIPermissionTest(APITestCase):
     
     def test_teacher_course_permissions(self):
         """Test teacher permissions for their own courses"""
-        teacher_token = Token.objects.create(user=self.teacher)
-        self.client.credentials(HTTP_AUTHORIZATION='Token ' + teacher_token.key)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.teacher_token.key)
         
         # Teacher should be able to update their own course
         url = reverse('api:course-detail', kwargs={'pk': self.course.pk})
@@ -436,11 +765,23 @@ class APIPermissionTest(APITestCase):
     
     def test_student_course_permissions(self):
         """Test student permissions for courses"""
-        student_token = Token.objects.create(user=self.student)
-        self.client.credentials(HTTP_AUTHORIZATION='Token ' + student_token.key)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
         
         # Student should not be able to update courses
         url = reverse('api:course-detail', kwargs={'pk': self.course.pk})
         data = {'title': 'Hacked Course Title'}
         response = self.client.patch(url, data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_status_update_owner_permissions(self):
+        """Test only the author can edit a status update"""
+        status_update = StatusUpdate.objects.create(user=self.teacher, content='Hello')
+        url = reverse('api:status-detail', kwargs={'pk': status_update.pk})
+        
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.student_token.key)
+        response = self.client.patch(url, {'content': 'Hacked'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.teacher_token.key)
+        response = self.client.patch(url, {'content': 'Edited'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
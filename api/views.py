@@ -5,19 +5,29 @@ from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnl
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 
 from accounts.models import UserProfile, StatusUpdate
 from courses.models import Course, CourseMaterial, Enrollment, Feedback, Notification
+from .authentication import remember_token
+from .caching import CachedListMixin, CachedRetrieveMixin
 from .serializers import (
-    UserSerializer, UserProfileSerializer, StatusUpdateSerializer,
+    UserSerializer, UserListSerializer, UserProfileSerializer, StatusUpdateSerializer,
     CourseSerializer, CourseMaterialSerializer, EnrollmentSerializer,
-    FeedbackSerializer, NotificationSerializer, UserRegistrationSerializer
+    FeedbackSerializer, NotificationSerializer, UserRegistrationSerializer,
+    EXPAND_ALL_USERS, get_expanded_fields
 )
 
 User = get_user_model()
 
 
+# Model columns rendered by CourseSerializer (enrollment_count is computed)
+COURSE_SERIALIZER_FIELDS = [
+    name for name in CourseSerializer.Meta.fields if name != 'enrollment_count'
+]
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """Custom permission to only allow owners of an object to edit it."""
     
@@ -28,12 +38,10 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions are only allowed to the owner of the object.
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        elif hasattr(obj, 'student'):
-            return obj.student == request.user
-        elif hasattr(obj, 'teacher'):
-            return obj.teacher == request.user
+        # Compare foreign key ids so the owner row is never loaded.
+        for owner_field in ('user_id', 'student_id', 'teacher_id'):
+            if hasattr(obj, owner_field):
+                return getattr(obj, owner_field) == request.user.pk
         return obj == request.user
 
 
@@ -46,6 +54,44 @@ class IsTeacherOrReadOnly(permissions.BasePermission):
         return request.user.is_authenticated and request.user.user_type == 'teacher'
 
 
+class ExpandUserRelationsMixin:
+    """Join the user relations a request expands with ``?expand=``
+    
+    Unexpanded relations are rendered as primary keys straight from the
+    foreign key column, so they need no join at all.
+    """
+    expand_user_relations = ()
+    
+    def get_expanded_user_relations(self, paths):
+        """Return the relation paths whose last field the request expands"""
+        expanded = get_expanded_fields(self.request)
+        return [
+            path for path in paths
+            if EXPAND_ALL_USERS in expanded or path.rsplit('__', 1)[-1] in expanded
+        ]
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        relations = self.get_expanded_user_relations(self.expand_user_relations)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset
+
+
+class EnrollmentCourseMixin(ExpandUserRelationsMixin):
+    """Load the nested courses of enrollments in one query, counts included"""
+    expand_user_relations = ('student',)
+    
+    def filter_queryset(self, queryset):
+        courses = Course.objects.annotate(enrollments_total=Count('enrollments'))
+        teacher = self.get_expanded_user_relations(('teacher',))
+        if teacher:
+            courses = courses.select_related(*teacher)
+        return super().filter_queryset(queryset).prefetch_related(
+            Prefetch('course', queryset=courses)
+        )
+
+
 # Authentication Views
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -55,6 +101,8 @@ def register(request):
     if serializer.is_valid():
         user = serializer.save()
         token, created = Token.objects.get_or_create(user=user)
+        # The client's next request authenticates without a token lookup
+        remember_token(token)
         return Response({
             'user': UserSerializer(user).data,
             'token': token.key
@@ -73,6 +121,7 @@ def login(request):
         user = authenticate(username=username, password=password)
         if user:
             token, created = Token.objects.get_or_create(user=user)
+            remember_token(token)
             return Response({
                 'user': UserSerializer(user).data,
                 'token': token.key
@@ -98,79 +147,95 @@ def logout(request):
 
 
 # User Views
-class UserListView(generics.ListAPIView):
+class UserListView(CachedListMixin, generics.ListAPIView):
     """List all users"""
-    queryset = User.objects.all().order_by('username')
-    serializer_class = UserSerializer
+    queryset = User.objects.only(*UserListSerializer.Meta.fields).order_by('username')
+    serializer_class = UserListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
     search_fields = ['username', 'first_name', 'last_name', 'email']
     ordering_fields = ['username', 'first_name', 'last_name', 'date_joined']
     ordering = ['username']  # Default ordering
     filterset_fields = ['user_type', 'is_active']
+    cache_models = (User,)
 
 
-class UserDetailView(generics.RetrieveUpdateAPIView):
+class UserDetailView(CachedRetrieveMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update user details"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    cache_models = (User,)
 
 
-class UserProfileListView(generics.ListCreateAPIView):
+class UserProfileListView(ExpandUserRelationsMixin, generics.ListCreateAPIView):
     """List and create user profiles"""
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
+    expand_user_relations = ('user',)
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class UserProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserProfileDetailView(ExpandUserRelationsMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update and delete user profile"""
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    expand_user_relations = ('user',)
 
 
-class StatusUpdateListView(generics.ListCreateAPIView):
+class StatusUpdateListView(ExpandUserRelationsMixin, generics.ListCreateAPIView):
     """List and create status updates"""
     queryset = StatusUpdate.objects.all().order_by('-created_at')
     serializer_class = StatusUpdateSerializer
     permission_classes = [IsAuthenticated]
+    expand_user_relations = ('user',)
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class StatusUpdateDetailView(generics.RetrieveUpdateDestroyAPIView):
+class StatusUpdateDetailView(ExpandUserRelationsMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update and delete status update"""
     queryset = StatusUpdate.objects.all()
     serializer_class = StatusUpdateSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    expand_user_relations = ('user',)
 
 
 # Course Views
-class CourseListView(generics.ListCreateAPIView):
+class CourseListView(CachedListMixin, ExpandUserRelationsMixin, generics.ListCreateAPIView):
     """List and create courses"""
-    queryset = Course.objects.filter(status='published')
+    # Only the columns CourseSerializer renders; long text fields stay in the database
+    queryset = Course.objects.filter(status='published').only(
+        *COURSE_SERIALIZER_FIELDS
+    ).annotate(
+        enrollments_total=Count('enrollments')
+    )
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsTeacherOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter, DjangoFilterBackend]
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'price', 'title']
     filterset_fields = ['teacher', 'price']
+    expand_user_relations = ('teacher',)
+    # Enrollment counts and expanded teachers are part of the page
+    cache_models = (Course, Enrollment, User)
     
     def perform_create(self, serializer):
         serializer.save(teacher=self.request.user)
 
 
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CourseDetailView(CachedRetrieveMixin, ExpandUserRelationsMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update and delete course"""
-    queryset = Course.objects.all()
+    queryset = Course.objects.annotate(enrollments_total=Count('enrollments'))
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    expand_user_relations = ('teacher',)
+    cache_models = (Course, Enrollment, User)
 
 
 class CourseMaterialListView(generics.ListCreateAPIView):
@@ -180,13 +245,6 @@ class CourseMaterialListView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['course', 'material_type']
-    
-    def get_queryset(self):
-        queryset = CourseMaterial.objects.all()
-        course_id = self.request.query_params.get('course', None)
-        if course_id:
-            queryset = queryset.filter(course_id=course_id)
-        return queryset
 
 
 class CourseMaterialDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -197,7 +255,7 @@ class CourseMaterialDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Enrollment Views
-class EnrollmentListView(generics.ListCreateAPIView):
+class EnrollmentListView(EnrollmentCourseMixin, generics.ListCreateAPIView):
     """List and create enrollments"""
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
@@ -216,7 +274,7 @@ class EnrollmentListView(generics.ListCreateAPIView):
         return Enrollment.objects.all()
 
 
-class EnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EnrollmentDetailView(EnrollmentCourseMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update and delete enrollment"""
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
@@ -224,7 +282,7 @@ class EnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Feedback Views
-class FeedbackListView(generics.ListCreateAPIView):
+class FeedbackListView(ExpandUserRelationsMixin, generics.ListCreateAPIView):
     """List and create feedback"""
     queryset = Feedback.objects.all().order_by('-created_at')
     serializer_class = FeedbackSerializer
@@ -232,60 +290,55 @@ class FeedbackListView(generics.ListCreateAPIView):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['course', 'rating']
     ordering_fields = ['created_at', 'rating']
+    expand_user_relations = ('student',)
     
     def perform_create(self, serializer):
         serializer.save(student=self.request.user)
-    
-    def get_queryset(self):
-        queryset = Feedback.objects.all()
-        course_id = self.request.query_params.get('course', None)
-        if course_id:
-            queryset = queryset.filter(course_id=course_id)
-        return queryset
 
 
-class FeedbackDetailView(generics.RetrieveUpdateDestroyAPIView):
+class FeedbackDetailView(ExpandUserRelationsMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update and delete feedback"""
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    expand_user_relations = ('student',)
 
 
 # Notification Views
-class NotificationListView(generics.ListCreateAPIView):
+class NotificationListView(ExpandUserRelationsMixin, generics.ListCreateAPIView):
     """List and create notifications"""
     queryset = Notification.objects.all().order_by('-created_at')
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_read', 'notification_type']
+    expand_user_relations = ('recipient', 'sender')
     
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        return super().get_queryset().filter(recipient=self.request.user)
 
 
-class NotificationDetailView(generics.RetrieveUpdateDestroyAPIView):
+class NotificationDetailView(ExpandUserRelationsMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update and delete notification"""
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    expand_user_relations = ('recipient', 'sender')
     
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        return super().get_queryset().filter(recipient=self.request.user)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_notification_read(request, pk):
     """Mark a notification as read"""
-    try:
-        notification = Notification.objects.get(pk=pk, recipient=request.user)
-        notification.is_read = True
-        notification.save()
-        return Response({'message': 'Notification marked as read'})
-    except Notification.DoesNotExist:
+    # A single UPDATE; no row matched means it is missing or not the user's
+    updated = Notification.objects.filter(pk=pk, recipient=request.user).update(is_read=True)
+    if not updated:
         return Response({'error': 'Notification not found'}, 
                        status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'Notification marked as read'})
 
 
 @api_view(['POST'])
@@ -293,26 +346,17 @@ def mark_notification_read(request, pk):
 def enroll_in_course(request, course_id):
     """Enroll user in a course"""
     try:
-        course = Course.objects.get(pk=course_id)
-        enrollment, created = Enrollment.objects.get_or_create(
-            student=request.user,
-            course=course
-        )
-        if created:
-            # Create notification for successful enrollment
-            Notification.objects.create(
-                recipient=request.user,
-                title=f"Enrolled in {course.title}",
-                message=f"You have successfully enrolled in the course '{course.title}'.",
-                notification_type='enrollment',
-                course=course
-            )
-            return Response({
-                'message': 'Successfully enrolled in course',
-                'enrollment': EnrollmentSerializer(enrollment).data
-            })
-        else:
-            return Response({'message': 'Already enrolled in this course'})
+        # The teacher is needed by the new enrollment notification signal
+        course = Course.objects.select_related('teacher').get(pk=course_id)
     except Course.DoesNotExist:
         return Response({'error': 'Course not found'}, 
                        status=status.HTTP_404_NOT_FOUND)
+    
+    enrollment, created = Enrollment.enroll_and_notify(request.user, course)
+    if created:
+        return Response({
+            'message': 'Successfully enrolled in course',
+            'enrollment': EnrollmentSerializer(enrollment).data
+        })
+    else:
+        return Response({'message': 'Already enrolled in this course'})
@@ -1,10 +1,33 @@
 from django.contrib import admin
+from django.db.models.functions import Substr
 from .models import ChatRoom, ChatRoomMembership, ChatMessage, PrivateChat, PrivateMessage
 
 
+class ContentPreviewAdminMixin:
+    """Show a preview of ``content`` without loading the full message bodies"""
+    
+    # Characters shown in the changelist preview
+    preview_length = 50
+    
+    def get_queryset(self, request):
+        """Fetch only the start of the content for the preview column"""
+        return super().get_queryset(request).annotate(
+            content_short=Substr('content', 1, self.preview_length + 1)
+        ).defer('content')
+    
+    def content_preview(self, obj):
+        """Show a preview of the content"""
+        preview = obj.content_short
+        if len(preview) > self.preview_length:
+            return preview[:self.preview_length] + "..."
+        return preview
+    content_preview.short_description = 'Content'
+
+
 @admin.register(ChatRoom)
 class ChatRoomAdmin(admin.ModelAdmin):
     list_display = ['name', 'course', 'created_by', 'created_at', 'is_active']
+    list_select_related = ['course', 'created_by']
     list_filter = ['is_active', 'created_at', 'course']
     search_fields = ['name', 'description', 'course__title']
     filter_horizontal = ['participants']
@@ -14,37 +37,33 @@ class ChatRoomAdmin(admin.ModelAdmin):
 @admin.register(ChatRoomMembership)
 class ChatRoomMembershipAdmin(admin.ModelAdmin):
     list_display = ['user', 'room', 'joined_at', 'is_active']
+    list_select_related = ['user', 'room__course']
     list_filter = ['is_active', 'joined_at']
     search_fields = ['user__username', 'room__name']
 
 
 @admin.register(ChatMessage)
-class ChatMessageAdmin(admin.ModelAdmin):
+class ChatMessageAdmin(ContentPreviewAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'room', 'content_preview', 'message_type', 'created_at', 'is_edited']
+    list_select_related = ['user', 'room__course']
     list_filter = ['message_type', 'is_edited', 'created_at', 'room']
     search_fields = ['content', 'user__username', 'room__name']
     readonly_fields = ['created_at', 'edited_at']
-    
-    def content_preview(self, obj):
-        return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
-    content_preview.short_description = 'Content'
 
 
 @admin.register(PrivateChat)
 class PrivateChatAdmin(admin.ModelAdmin):
     list_display = ['participant1', 'participant2', 'created_at', 'updated_at']
+    list_select_related = ['participant1', 'participant2']
     list_filter = ['created_at']
     search_fields = ['participant1__username', 'participant2__username']
     readonly_fields = ['created_at', 'updated_at']
 
 
 @admin.register(PrivateMessage)
-class PrivateMessageAdmin(admin.ModelAdmin):
+class PrivateMessageAdmin(ContentPreviewAdminMixin, admin.ModelAdmin):
     list_display = ['sender', 'chat', 'content_preview', 'message_type', 'created_at', 'is_read']
+    list_select_related = ['sender', 'chat__participant1', 'chat__participant2']
     list_filter = ['message_type', 'is_read', 'is_edited', 'created_at']
     search_fields = ['content', 'sender__username']
     readonly_fields = ['created_at', 'edited_at']
-    
-    def content_preview(self, obj):
-        return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
-    content_preview.short_description = 'Content'
@@ -0,0 +1,142 @@
+import asyncio
+
+from channels.db import database_sync_to_async
+from django.db import transaction
+
+from . import tasks
+from .models import ChatMessage, PrivateMessage
+
+
+class MessageBatcher:
+    """
+    Group commit for messages.
+    
+    Messages saved within ``delay`` seconds of each other, from any room or
+    connection served by this process, are written with a single
+    ``bulk_create``. Each caller still waits for its own row, so broadcasts
+    carry the real message id and timestamp.
+    
+    Writes run in tasks the batcher owns, so a sender that disconnects
+    mid-write cannot interrupt a batch other senders are waiting on. If a
+    batch fails, its rows are retried one by one and only the bad ones fail.
+    """
+    model = None
+    
+    def __init__(self, delay=0.05, max_size=100):
+        self.delay = delay
+        self.max_size = max_size
+        self.pending = []
+        self.timer = None
+        self.loop = None
+        self.flushes = set()
+    
+    async def save(self, message):
+        """Queue an unsaved message and return it once it is written"""
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            # A timer or futures left on an earlier loop can never fire here
+            self.loop = loop
+            self.timer = None
+            self.pending = []
+        future = loop.create_future()
+        self.pending.append((message, future))
+        if len(self.pending) >= self.max_size:
+            self.start_flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.delay, self.start_flush)
+        return await future
+    
+    def start_flush(self):
+        """Hand every queued message to a new flush task"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        
+        # Keep a reference so the task is not garbage collected mid-write
+        task = self.loop.create_task(self.flush(batch))
+        self.flushes.add(task)
+        task.add_done_callback(self.flushes.discard)
+    
+    async def flush(self, batch):
+        """Write a batch of messages in one query, resolving each sender's future"""
+        messages = [message for message, future in batch]
+        try:
+            try:
+                await database_sync_to_async(self.write_batch)(messages)
+                errors = [None] * len(messages)
+            except Exception:
+                errors = await database_sync_to_async(self.write_each)(messages)
+        except BaseException:
+            for message, future in batch:
+                if not future.done():
+                    future.cancel()
+            raise
+        
+        for (message, future), error in zip(batch, errors):
+            # Senders that disconnected have already cancelled their future
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(message)
+            else:
+                future.set_exception(error)
+    
+    def write_batch(self, messages):
+        # A failed batch rolls back cleanly even inside an outer transaction
+        with transaction.atomic():
+            self.write(messages)
+    
+    def write(self, messages):
+        self.model.objects.bulk_create(messages)
+    
+    def write_each(self, messages):
+        """Write messages one at a time, returning each one's error (or None)"""
+        errors = []
+        for message in messages:
+            if message.pk is not None:
+                # Already committed; the batch failed after writing it
+                errors.append(None)
+                continue
+            try:
+                self.write_batch([message])
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+
+class ChatMessageBatcher(MessageBatcher):
+    """
+    Group commit for chat room messages.
+    
+    ``ChatMessage`` has no signal handlers, so skipping ``save()`` is safe.
+    """
+    model = ChatMessage
+
+
+class PrivateMessageBatcher(MessageBatcher):
+    """
+    Group commit for private messages.
+    
+    ``bulk_create`` skips the ``post_save`` receiver that queues the
+    recipient's notification, so the whole batch is queued as one task.
+    Queueing is robust: if the broker is down the error is logged, and the
+    committed messages are still returned to their senders rather than
+    failing and being resent.
+    """
+    model = PrivateMessage
+    
+    def write(self, messages):
+        super().write(messages)
+        message_ids = [message.id for message in messages]
+        transaction.on_commit(
+            lambda: tasks.notify_private_messages.delay(message_ids), robust=True
+        )
+
+
+chat_message_batcher = ChatMessageBatcher()
+private_message_batcher = PrivateMessageBatcher()
@@ -1,13 +1,37 @@
-import json
+import time
+
+import orjson
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import ChatRoom, ChatMessage, PrivateChat, PrivateMessage, ChatRoomMembership
+from django.core.cache import cache
+from .batching import chat_message_batcher, private_message_batcher
+from .models import (
+    ChatRoom, ChatMessage, PrivateChat, PrivateMessage, ChatRoomMembership,
+    PRIVATE_CHAT_CACHE_KEY, PRIVATE_CHAT_CACHE_TIMEOUT
+)
 
 User = get_user_model()
 
 
-class ChatRoomConsumer(AsyncWebsocketConsumer):
+class TypingThrottleMixin:
+    """Forward at most one repeated typing event per interval
+    
+    Clients report typing on every keystroke; each forwarded event wakes every
+    member of the group. A change of typing state is always forwarded.
+    """
+    typing_interval = 1.0
+    
+    def should_send_typing(self, is_typing):
+        now = time.monotonic()
+        last_state, last_sent = getattr(self, '_last_typing', (None, 0.0))
+        if is_typing == last_state and now - last_sent < self.typing_interval:
+            return False
+        self._last_typing = (is_typing, now)
+        return True
+
+
+class ChatRoomConsumer(TypingThrottleMixin, AsyncWebsocketConsumer):
     """WebSocket consumer for chat rooms"""
     
     async def connect(self):
@@ -64,7 +88,7 @@ class ChatRoomConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Receive message from WebSocket"""
         try:
-            text_data_json = json.loads(text_data)
+            text_data_json = orjson.loads(text_data)
             message_type = text_data_json.get('type', 'message')
             
             if message_type == 'message':
@@ -86,89 +110,90 @@ class ChatRoomConsumer(AsyncWebsocketConsumer):
                     }
                 )
             elif message_type == 'typing':
-                # Send typing indicator
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        'type': 'typing_indicator',
-                        'user': self.user.username,
-                        'user_id': self.user.id,
-                        'is_typing': text_data_json.get('is_typing', False)
-                    }
-                )
+                is_typing = text_data_json.get('is_typing', False)
+                # Send typing indicator, skipping repeats within the interval
+                if self.should_send_typing(is_typing):
+                    await self.channel_layer.group_send(
+                        self.room_group_name,
+                        {
+                            'type': 'typing_indicator',
+                            'user': self.user.username,
+                            'user_id': self.user.id,
+                            'is_typing': is_typing
+                        }
+                    )
         except Exception as e:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=orjson.dumps({
                 'error': f'Error processing message: {str(e)}'
-            }))
+            }).decode())
     
     async def chat_message(self, event):
         """Receive message from room group"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=orjson.dumps({
             'type': 'message',
             'message': event['message'],
             'user': event['user'],
             'user_id': event['user_id'],
             'message_id': event['message_id'],
             'created_at': event['created_at']
-        }))
+        }).decode())
     
     async def user_joined(self, event):
         """Send user joined notification"""
         if event['user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=orjson.dumps({
                 'type': 'user_joined',
                 'message': f"{event['user']} joined the chat",
                 'user': event['user'],
                 'user_id': event['user_id']
-            }))
+            }).decode())
     
     async def user_left(self, event):
         """Send user left notification"""
         if event['user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=orjson.dumps({
                 'type': 'user_left',
                 'message': f"{event['user']} left the chat",
                 'user': event['user'],
                 'user_id': event['user_id']
-            }))
+            }).decode())
     
     async def typing_indicator(self, event):
         """Send typing indicator"""
         if event['user_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=orjson.dumps({
                 'type': 'typing',
                 'user': event['user'],
                 'user_id': event['user_id'],
                 'is_typing': event['is_typing']
-            }))
+            }).decode())
     
     @database_sync_to_async
     def check_room_permission(self):
         """Check if user has permission to access this chat room"""
-        try:
-            room = ChatRoom.objects.get(id=self.room_id)
-            # Check if user is enrolled in the course or is the teacher
-            if self.user.user_type == 'teacher' and room.course.teacher == self.user:
-                return True
-            elif self.user.user_type == 'student':
-                return room.course.enrollments.filter(student=self.user, is_active=True).exists()
-            return False
-        except ChatRoom.DoesNotExist:
-            return False
+        # Check if user is enrolled in the course or is the teacher, in one query
+        rooms = ChatRoom.objects.filter(id=self.room_id)
+        if self.user.user_type == 'teacher':
+            return rooms.filter(course__teacher=self.user).exists()
+        elif self.user.user_type == 'student':
+            return rooms.filter(
+                course__enrollments__student=self.user,
+                course__enrollments__is_active=True
+            ).exists()
+        return False
     
-    @database_sync_to_async
-    def save_message(self, message):
-        """Save message to database"""
-        room = ChatRoom.objects.get(id=self.room_id)
-        chat_message = ChatMessage.objects.create(
-            room=room,
+    async def save_message(self, message):
+        """Save message to database, batched with other recent messages"""
+        # The room was checked on connect, so its id is all the insert needs
+        chat_message = ChatMessage(
+            room_id=self.room_id,
             user=self.user,
             content=message
         )
-        return chat_message
+        return await chat_message_batcher.save(chat_message)
 
 
-class PrivateChatConsumer(AsyncWebsocketConsumer):
+class PrivateChatConsumer(TypingThrottleMixin, AsyncWebsocketConsumer):
     """WebSocket consumer for private chats"""
     
     async def connect(self):
@@ -204,7 +229,7 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Receive message from WebSocket"""
         try:
-            text_data_json = json.loads(text_data)
+            text_data_json = orjson.loads(text_data)
             message_type = text_data_json.get('type', 'message')
             
             if message_type == 'message':
@@ -226,61 +251,73 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
                     }
                 )
             elif message_type == 'typing':
-                # Send typing indicator
-                await self.channel_layer.group_send(
-                    self.room_group_name,
-                    {
-                        'type': 'typing_indicator',
-                        'sender': self.user.username,
-                        'sender_id': self.user.id,
-                        'is_typing': text_data_json.get('is_typing', False)
-                    }
-                )
+                is_typing = text_data_json.get('is_typing', False)
+                # Send typing indicator, skipping repeats within the interval
+                if self.should_send_typing(is_typing):
+                    await self.channel_layer.group_send(
+                        self.room_group_name,
+                        {
+                            'type': 'typing_indicator',
+                            'sender': self.user.username,
+                            'sender_id': self.user.id,
+                            'is_typing': is_typing
+                        }
+                    )
         except Exception as e:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=orjson.dumps({
                 'error': f'Error processing message: {str(e)}'
-            }))
+            }).decode())
     
     async def private_message(self, event):
         """Receive message from room group"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=orjson.dumps({
             'type': 'message',
             'message': event['message'],
             'sender': event['sender'],
             'sender_id': event['sender_id'],
             'message_id': event['message_id'],
             'created_at': event['created_at']
-        }))
+        }).decode())
     
     async def typing_indicator(self, event):
         """Send typing indicator"""
         if event['sender_id'] != self.user.id:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=orjson.dumps({
                 'type': 'typing',
                 'sender': event['sender'],
                 'sender_id': event['sender_id'],
                 'is_typing': event['is_typing']
-            }))
+            }).decode())
     
     @database_sync_to_async
     def get_or_create_private_chat(self):
         """Get or create private chat"""
-        other_user = User.objects.get(id=self.other_user_id)
-        user1, user2 = sorted([self.user, other_user], key=lambda u: u.id)
+        user1_id, user2_id = sorted([self.user.id, int(self.other_user_id)])
+        cache_key = PRIVATE_CHAT_CACHE_KEY.format(user1_id, user2_id)
         
-        private_chat, created = PrivateChat.objects.get_or_create(
-            participant1=user1,
-            participant2=user2
-        )
+        # Reconnects of a known pair only need the chat's id, kept in the cache
+        chat_id = cache.get(cache_key)
+        if chat_id is not None:
+            private_chat = PrivateChat(id=chat_id, participant1_id=user1_id, participant2_id=user2_id)
+        else:
+            # Existing chats are found by participant ids alone; the other user
+            # is only loaded (and checked to exist) when a chat has to be created
+            private_chat = PrivateChat.objects.filter(
+                participant1_id=user1_id,
+                participant2_id=user2_id
+            ).first()
+            if private_chat is None:
+                other_user = User.objects.get(id=self.other_user_id)
+                private_chat, created = PrivateChat.get_or_create_between(self.user, other_user)
+            cache.set(cache_key, private_chat.id, PRIVATE_CHAT_CACHE_TIMEOUT)
         self.private_chat = private_chat
         return private_chat
     
-    @database_sync_to_async
-    def save_private_message(self, message):
-        """Save private message to database"""
-        private_message = PrivateMessage.objects.create(
+    async def save_private_message(self, message):
+        """Save private message to database, batched with other recent messages"""
+        private_message = PrivateMessage(
             chat=self.private_chat,
             sender=self.user,
             content=message
         )
-        return private_message
+        return await private_message_batcher.save(private_message)
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-15 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['room', '-created_at'], name='chat_chatme_room_id_df087f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='privatemessage',
+            index=models.Index(fields=['chat', '-created_at'], name='chat_privat_chat_id_32503b_idx'),
+        ),
+    ]
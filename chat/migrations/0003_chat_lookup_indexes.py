@@ -0,0 +1,25 @@
+# Generated by Django 4.2.15 on 2026-10-15 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_message_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='privatechat',
+            index=models.Index(fields=['participant1', '-updated_at'], name='chat_privat_partici_37178a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='privatechat',
+            index=models.Index(fields=['participant2', '-updated_at'], name='chat_privat_partici_00da13_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='privatemessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['chat', 'sender'], name='privatemessage_unread_idx'),
+        ),
+    ]
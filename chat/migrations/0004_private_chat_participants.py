@@ -0,0 +1,44 @@
+# Generated by Django 4.2.15 on 2026-10-15 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def add_participants(apps, schema_editor):
+    """Record the participants of existing private chats"""
+    PrivateChat = apps.get_model('chat', 'PrivateChat')
+    PrivateChatParticipant = apps.get_model('chat', 'PrivateChatParticipant')
+    chats = PrivateChat.objects.values_list('pk', 'participant1_id', 'participant2_id')
+    PrivateChatParticipant.objects.bulk_create([
+        PrivateChatParticipant(chat_id=chat_id, user_id=user_id)
+        for chat_id, participant1_id, participant2_id in chats.iterator()
+        for user_id in (participant1_id, participant2_id)
+    ], batch_size=1000, ignore_conflicts=True)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chat', '0003_chat_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrivateChatParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='chat.privatechat')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'chat')},
+            },
+        ),
+        migrations.AddField(
+            model_name='privatechat',
+            name='participants',
+            field=models.ManyToManyField(related_name='private_chats', through='chat.PrivateChatParticipant', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(add_participants, migrations.RunPython.noop),
+    ]
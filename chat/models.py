@@ -4,6 +4,10 @@ from courses.models import Course
 
 User = get_user_model()
 
+# Cached PrivateChat id for a (participant1_id, participant2_id) pair
+PRIVATE_CHAT_CACHE_KEY = 'chat:private:{}_{}'
+PRIVATE_CHAT_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 class ChatRoom(models.Model):
     """Model for chat rooms"""
@@ -61,6 +65,10 @@ class ChatMessage(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # A room's history, newest first (keyset pagination)
+            models.Index(fields=['room', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.username}: {self.content[:50]}"
@@ -70,20 +78,78 @@ class PrivateChat(models.Model):
     """Model for private chats between two users"""
     participant1 = models.ForeignKey(User, on_delete=models.CASCADE, related_name='private_chats_as_p1')
     participant2 = models.ForeignKey(User, on_delete=models.CASCADE, related_name='private_chats_as_p2')
+    # Both participants again, so a user's chats are found with one index lookup
+    participants = models.ManyToManyField(User, through='PrivateChatParticipant', related_name='private_chats')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['participant1', 'participant2']
+        indexes = [
+            # A user's chats by recent activity, from either side of the chat
+            models.Index(fields=['participant1', '-updated_at']),
+            models.Index(fields=['participant2', '-updated_at']),
+        ]
     
     def __str__(self):
         return f"Private chat between {self.participant1.username} and {self.participant2.username}"
     
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            self.add_participants()
+    
+    @classmethod
+    def get_or_create_between(cls, user_a, user_b):
+        """
+        The private chat between two users, created if needed, returning
+        ``(chat, created)``.
+        
+        Existing chats cost a single SELECT. New ones are inserted with
+        ON CONFLICT DO NOTHING, so two users opening the same chat at once
+        need neither a savepoint nor an IntegrityError retry.
+        """
+        participant1_id, participant2_id = sorted([user_a.id, user_b.id])
+        lookup = {'participant1_id': participant1_id, 'participant2_id': participant2_id}
+        chat = cls.objects.filter(**lookup).first()
+        if chat is not None:
+            return chat, False
+        
+        new_chat = cls(**lookup)
+        cls.objects.bulk_create([new_chat], ignore_conflicts=True)
+        chat = cls.objects.get(**lookup)
+        # A concurrent request may have inserted the row instead; ignored
+        # conflicts set no pk, so tell them apart by the stamped created_at
+        created = chat.created_at == new_chat.created_at
+        # bulk_create skips save(), which records the participants
+        chat.add_participants()
+        return chat, created
+    
+    def add_participants(self):
+        """Record both participants in ``participants``"""
+        PrivateChatParticipant.objects.bulk_create([
+            PrivateChatParticipant(user_id=self.participant1_id, chat=self),
+            PrivateChatParticipant(user_id=self.participant2_id, chat=self),
+        ], ignore_conflicts=True)
+    
     @property
     def get_participants(self):
         return [self.participant1, self.participant2]
 
 
+class PrivateChatParticipant(models.Model):
+    """Model for private chat participation"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    chat = models.ForeignKey(PrivateChat, on_delete=models.CASCADE)
+    
+    class Meta:
+        unique_together = ['user', 'chat']
+    
+    def __str__(self):
+        return f"{self.user.username} in chat {self.chat_id}"
+
+
 class PrivateMessage(models.Model):
     """Model for private messages"""
     chat = models.ForeignKey(PrivateChat, on_delete=models.CASCADE, related_name='messages')
@@ -106,6 +172,16 @@ class PrivateMessage(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # A chat's history, newest first (keyset pagination)
+            models.Index(fields=['chat', '-created_at']),
+            # Unread messages, checked every time a chat is opened
+            models.Index(
+                fields=['chat', 'sender'],
+                condition=models.Q(is_read=False),
+                name='privatemessage_unread_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.sender.username}: {self.content[:50]}"
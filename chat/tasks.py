@@ -0,0 +1,67 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from channels.layers import get_channel_layer
+
+from .models import PrivateMessage
+from courses.models import Notification
+
+
+def build_notification(message):
+    """Unsaved notification telling the other participant about ``message``"""
+    chat = message.chat
+    sender_user = message.sender
+    
+    # Get the recipient (the other participant in the chat)
+    recipient = chat.participant2 if sender_user == chat.participant1 else chat.participant1
+    sender_name = sender_user.get_full_name() or sender_user.username
+    snippet = message.content[:50]
+    ellipsis = '...' if len(message.content) > 50 else ''
+    
+    return Notification(
+        recipient=recipient,
+        sender=sender_user,
+        notification_type='system',
+        title=f'New private message from {sender_name}',
+        message=f'{sender_name} sent you a message: "{snippet}{ellipsis}"',
+        is_important=False
+    )
+
+
+@shared_task
+def notify_private_messages(message_ids):
+    """Notify the recipients of a batch of private messages"""
+    messages = PrivateMessage.objects.select_related(
+        'sender', 'chat__participant1', 'chat__participant2'
+    ).filter(pk__in=message_ids).order_by('created_at')
+    notifications = [build_notification(message) for message in messages]
+    if not notifications:
+        return
+    
+    # One INSERT for the whole batch
+    Notification.objects.bulk_create(notifications)
+    
+    # Send real-time notifications to every recipient in one trip to the event loop
+    channel_layer = get_channel_layer()
+    
+    async def send_all():
+        await asyncio.gather(*(
+            channel_layer.group_send(
+                f"notifications_{notification.recipient_id}",
+                {
+                    'type': 'notification_message',
+                    'data': {
+                        'id': notification.id,
+                        'title': notification.title,
+                        'message': notification.message,
+                        'type': notification.notification_type,
+                        'is_important': notification.is_important,
+                        'created_at': 'just now'
+                    }
+                }
+            )
+            for notification in notifications
+        ))
+    
+    async_to_sync(send_all)()
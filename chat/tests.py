@@ -1,13 +1,35 @@
-from django.test import TestCase, Client
+import asyncio
+import json
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
-from .models import PrivateChat, PrivateMessage, ChatRoom, ChatMessage, ChatRoomMembership
-from courses.models import Course
+from asgiref.sync import async_to_sync
+from .models import PrivateChat, PrivateChatParticipant, PrivateMessage, ChatRoom, ChatMessage, ChatRoomMembership
+from courses.models import Course, Enrollment, Notification
+from . import views
+from .batching import PrivateMessageBatcher
+from .consumers import ChatRoomConsumer, PrivateChatConsumer
+from .tasks import notify_private_messages
 
 User = get_user_model()
 
 
+def write_queries(queries):
+    """Captured INSERTs, failing on anything but INSERTs and savepoints"""
+    statements = [
+        query['sql'] for query in queries.captured_queries
+        if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+    ]
+    assert all(sql.startswith('INSERT') for sql in statements), statements
+    return statements
+
+
 class PrivateChatModelTest(TestCase):
     """Test cases for PrivateChat model"""
     
@@ -54,6 +76,39 @@ class PrivateChatModelTest(TestCase):
         )
         expected_str = f"Private chat between {self.user1.username} and {self.user2.username}"
         self.assertEqual(str(chat), expected_str)
+    
+    def test_participants_recorded_on_create(self):
+        """Test that both users are linked to a new chat"""
+        chat = PrivateChat.objects.create(
+            participant1=self.user1,
+            participant2=self.user2
+        )
+        self.assertCountEqual(chat.participants.all(), [self.user1, self.user2])
+        self.assertEqual(list(self.user2.private_chats.all()), [chat])
+        
+        chat.save()
+        self.assertEqual(PrivateChatParticipant.objects.filter(chat=chat).count(), 2)
+    
+    def test_get_or_create_between(self):
+        """Test that the chat between two users is created once"""
+        chat, created = PrivateChat.get_or_create_between(self.user2, self.user1)
+        self.assertTrue(created)
+        self.assertEqual((chat.participant1_id, chat.participant2_id), (self.user1.id, self.user2.id))
+        self.assertCountEqual(chat.participants.all(), [self.user1, self.user2])
+        
+        with self.assertNumQueries(1):
+            same_chat, created = PrivateChat.get_or_create_between(self.user1, self.user2)
+        self.assertFalse(created)
+        self.assertEqual(same_chat, chat)
+    
+    def test_get_or_create_between_loses_race(self):
+        """Test that a chat inserted after the first lookup is not reported as created"""
+        chat = PrivateChat.objects.create(participant1=self.user1, participant2=self.user2)
+        # Simulate the other request inserting between the lookup and the insert
+        with mock.patch('django.db.models.QuerySet.first', return_value=None):
+            same_chat, created = PrivateChat.get_or_create_between(self.user1, self.user2)
+        self.assertFalse(created)
+        self.assertEqual(same_chat, chat)
 
 
 class PrivateMessageModelTest(TestCase):
@@ -98,6 +153,42 @@ class PrivateMessageModelTest(TestCase):
         )
         expected_str = f"{self.user1.username}: Test message"
         self.assertEqual(str(message), expected_str)
+    
+    def test_notification_queued_on_commit(self):
+        """Test that the recipient notification is queued after commit"""
+        with mock.patch('chat.tasks.notify_private_messages.delay') as delay:
+            with self.captureOnCommitCallbacks() as callbacks:
+                message = PrivateMessage.objects.create(
+                    chat=self.chat,
+                    sender=self.user1,
+                    content='Hello'
+                )
+            delay.assert_not_called()
+            
+            for callback in callbacks:
+                callback()
+            delay.assert_called_once_with([message.id])
+    
+    def test_notify_private_messages_task(self):
+        """Test that the task notifies the other participant of each message"""
+        messages = PrivateMessage.objects.bulk_create([
+            PrivateMessage(chat=self.chat, sender=self.user1, content='x' * 60),
+            PrivateMessage(chat=self.chat, sender=self.user2, content='Reply'),
+        ])
+        with mock.patch('chat.tasks.get_channel_layer') as get_channel_layer:
+            get_channel_layer.return_value.group_send = mock.AsyncMock()
+            with self.assertNumQueries(2):
+                notify_private_messages([message.id for message in messages])
+        
+        notification = Notification.objects.get(recipient=self.user2)
+        self.assertEqual(notification.sender, self.user1)
+        self.assertTrue(notification.message.endswith('x..."'))
+        self.assertTrue(Notification.objects.filter(recipient=self.user1, sender=self.user2).exists())
+        
+        group_send = get_channel_layer.return_value.group_send
+        self.assertEqual(group_send.await_count, 2)
+        events = {call.args[0]: call.args[1] for call in group_send.await_args_list}
+        self.assertEqual(events[f'notifications_{self.user2.id}']['data']['id'], notification.id)
 
 
 class ChatRoomModelTest(TestCase):
@@ -141,6 +232,216 @@ class ChatRoomModelTest(TestCase):
         self.assertEqual(str(room), expected_str)
 
 
+class ChatRoomConsumerTest(TestCase):
+    """Test cases for the chat room consumer's database helpers"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.teacher = User.objects.create_user(
+            username='teacher',
+            email='teacher@test.com',
+            password='testpass123',
+            user_type='teacher'
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            description='Test description',
+            teacher=self.teacher
+        )
+        self.room = ChatRoom.objects.create(
+            name='Course Discussion',
+            course=self.course,
+            created_by=self.teacher
+        )
+        self.consumer = ChatRoomConsumer()
+        self.consumer.room_id = self.room.id
+        self.consumer.user = self.teacher
+    
+    def test_teacher_room_permission_takes_one_query(self):
+        """Test the course teacher is checked without loading the teacher"""
+        with self.assertNumQueries(1):
+            self.assertTrue(async_to_sync(self.consumer.check_room_permission)())
+    
+    def test_student_room_permission_takes_one_query(self):
+        """Test a student's enrollment is checked with the room in one query"""
+        student = User.objects.create_user(
+            username='student',
+            email='student@test.com',
+            password='testpass123',
+            user_type='student'
+        )
+        self.consumer.user = student
+        with self.assertNumQueries(1):
+            self.assertFalse(async_to_sync(self.consumer.check_room_permission)())
+        
+        # bulk_create skips the enrollment notification signals
+        Enrollment.objects.bulk_create([Enrollment(student=student, course=self.course)])
+        with self.assertNumQueries(1):
+            self.assertTrue(async_to_sync(self.consumer.check_room_permission)())
+    
+    def test_save_message_does_not_refetch_room(self):
+        """Test saving a message is a single insert"""
+        with CaptureQueriesContext(connection) as queries:
+            message = async_to_sync(self.consumer.save_message)('Hello class')
+        self.assertEqual(len(write_queries(queries)), 1)
+        self.assertEqual(message.room, self.room)
+        self.assertEqual(message.content, 'Hello class')
+    
+    def test_repeated_typing_events_are_throttled(self):
+        """Test only state changes and one event per interval are forwarded"""
+        with mock.patch('chat.consumers.time.monotonic', side_effect=[10.0, 10.3, 11.2, 11.3]):
+            self.assertTrue(self.consumer.should_send_typing(True))
+            self.assertFalse(self.consumer.should_send_typing(True))
+            self.assertTrue(self.consumer.should_send_typing(True))
+            self.assertTrue(self.consumer.should_send_typing(False))
+    
+    def test_concurrent_messages_are_saved_together(self):
+        """Test messages arriving together are written in one insert"""
+        async def send_all():
+            return await asyncio.gather(*[
+                self.consumer.save_message(f'Message {i}') for i in range(3)
+            ])
+        
+        with CaptureQueriesContext(connection) as queries:
+            messages = async_to_sync(send_all)()
+        self.assertEqual(len(write_queries(queries)), 1)
+        self.assertTrue(all(message.pk for message in messages))
+        self.assertEqual(
+            list(self.room.messages.values_list('content', flat=True)),
+            ['Message 0', 'Message 1', 'Message 2']
+        )
+    
+    def test_disconnected_sender_does_not_block_batch(self):
+        """Test a cancelled sender does not stop the rest of its batch resolving"""
+        async def send_and_disconnect():
+            gone = asyncio.ensure_future(self.consumer.save_message('Gone'))
+            stays = asyncio.ensure_future(self.consumer.save_message('Stays'))
+            await asyncio.sleep(0)
+            gone.cancel()
+            return await asyncio.wait_for(stays, timeout=5)
+        
+        message = async_to_sync(send_and_disconnect)()
+        self.assertTrue(message.pk)
+        self.assertEqual(message.content, 'Stays')
+    
+    def test_bad_message_fails_alone(self):
+        """Test a row that cannot be written only fails its own sender"""
+        async def send_all():
+            return await asyncio.gather(
+                self.consumer.save_message('First'),
+                self.consumer.save_message(None),
+                self.consumer.save_message('Last'),
+                return_exceptions=True
+            )
+        
+        first, bad, last = async_to_sync(send_all)()
+        self.assertIsInstance(bad, IntegrityError)
+        self.assertTrue(first.pk and last.pk)
+        self.assertEqual(
+            list(self.room.messages.values_list('content', flat=True)), ['First', 'Last']
+        )
+
+
+class PrivateChatConsumerTest(TestCase):
+    """Test cases for the private chat consumer's database helpers"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user1 = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        self.user2 = User.objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='testpass123'
+        )
+        self.consumer = PrivateChatConsumer()
+        self.consumer.user = self.user2
+        self.consumer.other_user_id = str(self.user1.id)
+    
+    def test_get_or_create_private_chat(self):
+        """Test a known chat is found without a database round trip"""
+        cache.clear()
+        chat = async_to_sync(self.consumer.get_or_create_private_chat)()
+        self.assertEqual(chat.participant1, self.user1)
+        self.assertEqual(chat.participant2, self.user2)
+        
+        # Reconnects take the chat id from the cache
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(self.consumer.get_or_create_private_chat)(), chat)
+        self.assertEqual(PrivateChat.objects.count(), 1)
+        
+        # Deleting the chat drops its cached id
+        chat_id = chat.pk
+        chat.delete()
+        recreated = async_to_sync(self.consumer.get_or_create_private_chat)()
+        self.assertNotEqual(recreated.pk, chat_id)
+        self.assertTrue(PrivateChat.objects.filter(pk=recreated.pk).exists())
+    
+    def test_concurrent_private_messages_are_saved_together(self):
+        """Test messages arriving together are written and notified as one batch"""
+        self.consumer.private_chat = PrivateChat.objects.create(
+            participant1=self.user1, participant2=self.user2
+        )
+        
+        async def send_all():
+            return await asyncio.gather(*[
+                self.consumer.save_private_message(f'Message {i}') for i in range(3)
+            ])
+        
+        with mock.patch('chat.tasks.notify_private_messages.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                with CaptureQueriesContext(connection) as queries:
+                    messages = async_to_sync(send_all)()
+        self.assertEqual(len(write_queries(queries)), 1)
+        self.assertTrue(all(message.pk for message in messages))
+        delay.assert_called_once_with([message.pk for message in messages])
+
+
+class PrivateMessageBatcherCommitTest(TransactionTestCase):
+    """Test cases for private message batches that really commit"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user1 = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        self.user2 = User.objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='testpass123'
+        )
+        self.consumer = PrivateChatConsumer()
+        self.consumer.user = self.user2
+        self.consumer.private_chat = PrivateChat.objects.create(
+            participant1=self.user1, participant2=self.user2
+        )
+    
+    def test_broker_failure_does_not_fail_committed_message(self):
+        """Test a failed task enqueue neither fails nor duplicates the message"""
+        with mock.patch(
+            'chat.tasks.notify_private_messages.delay', side_effect=ConnectionError('broker down')
+        ) as delay:
+            message = async_to_sync(self.consumer.save_private_message)('Hello')
+        
+        delay.assert_called_once_with([message.pk])
+        self.assertEqual(
+            list(PrivateMessage.objects.values_list('pk', 'content')), [(message.pk, 'Hello')]
+        )
+    
+    def test_write_each_skips_committed_messages(self):
+        """Test the per-row retry does not insert a message twice"""
+        message = PrivateMessage(chat=self.consumer.private_chat, sender=self.user2, content='Once')
+        with mock.patch('chat.tasks.notify_private_messages.delay'):
+            PrivateMessageBatcher().write_batch([message])
+            self.assertEqual(PrivateMessageBatcher().write_each([message]), [None])
+        self.assertEqual(PrivateMessage.objects.count(), 1)
+
+
 class ChatViewsTest(TestCase):
     """Test cases for Chat views"""
     
@@ -219,6 +520,270 @@ class ChatViewsTest(TestCase):
         )
 
 
+class PrivateChatListViewTest(TestCase):
+    """Test cases for the private chat list view"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123',
+            user_type='student'
+        )
+        self.client.login(username='user1', password='testpass123')
+    
+    def create_chat(self, username, *contents):
+        other = User.objects.create_user(
+            username=username, email=f'{username}@test.com', password='testpass123'
+        )
+        chat = PrivateChat.objects.create(participant1=self.user, participant2=other)
+        PrivateMessage.objects.bulk_create([
+            PrivateMessage(chat=chat, sender=other, content=content)
+            for content in contents
+        ])
+        return chat
+    
+    def test_last_message_fetched_in_one_query(self):
+        """The last messages of all chats are loaded together"""
+        self.create_chat('other1', 'first one', 'last one')
+        with CaptureQueriesContext(connection) as single_chat:
+            self.client.get(reverse('chat:private_list'))
+        
+        self.create_chat('other2', 'first two', 'last two')
+        self.create_chat('other3')
+        with self.assertNumQueries(len(single_chat)):
+            response = self.client.get(reverse('chat:private_list'))
+        
+        chat_data = {item['other_user'].username: item for item in response.context['chat_data']}
+        self.assertEqual(chat_data['other1']['last_message'].content, 'last one')
+        self.assertEqual(chat_data['other2']['last_message'].content, 'last two')
+        self.assertIsNone(chat_data['other3']['last_message'])
+        self.assertContains(response, 'other2:')
+    
+    def test_chats_paginated(self):
+        """Chats are listed 25 to a page, most recently active first"""
+        for i in range(26):
+            self.create_chat(f'other{i}')
+        
+        response = self.client.get(reverse('chat:private_list'))
+        self.assertEqual(len(response.context['chat_data']), 25)
+        self.assertEqual(response.context['chat_data'][0]['other_user'].username, 'other25')
+        self.assertContains(response, '?page=2')
+        
+        response = self.client.get(reverse('chat:private_list'), {'page': 2})
+        self.assertEqual(
+            [item['other_user'].username for item in response.context['chat_data']], ['other0']
+        )
+
+
+class PrivateChatDetailViewTest(TestCase):
+    """Test cases for marking messages read in the private chat detail view"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user1 = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        self.user2 = User.objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='testpass123'
+        )
+        self.chat = PrivateChat.objects.create(participant1=self.user1, participant2=self.user2)
+        self.url = reverse('chat:private_detail', kwargs={'user_id': self.user2.id})
+        self.client.login(username='user1', password='testpass123')
+    
+    def add_message(self, sender, is_read=False):
+        PrivateMessage.objects.bulk_create([
+            PrivateMessage(chat=self.chat, sender=sender, content='Hi', is_read=is_read)
+        ])
+    
+    def message_updates(self, queries):
+        return [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "chat_privatemessage"')
+        ]
+    
+    def test_unread_messages_marked_read(self):
+        """Test that opening the chat marks the other user's messages read"""
+        self.add_message(self.user2)
+        self.add_message(self.user1)
+        
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(PrivateMessage.objects.filter(sender=self.user2, is_read=False).exists())
+        self.assertTrue(PrivateMessage.objects.filter(sender=self.user1, is_read=False).exists())
+    
+    def test_no_update_without_unread_messages(self):
+        """Test that re-opening a read chat does not write"""
+        self.add_message(self.user2, is_read=True)
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertEqual(self.message_updates(queries), [])
+    
+    def test_latest_messages_shown_with_cursor(self):
+        """Test that the newest page is shown and the cursor reaches older ones"""
+        start = timezone.now() - timezone.timedelta(hours=1)
+        messages = PrivateMessage.objects.bulk_create([
+            PrivateMessage(chat=self.chat, sender=self.user2, content=f'Message {i}', is_read=True)
+            for i in range(55)
+        ])
+        # Ten messages share each timestamp, so the page boundary falls inside a tie
+        for i, message in enumerate(messages):
+            message.created_at = start + timezone.timedelta(seconds=i // 10)
+        PrivateMessage.objects.bulk_update(messages, ['created_at'])
+        
+        response = self.client.get(self.url)
+        page = response.context['messages']
+        self.assertEqual([m.content for m in page], [f'Message {i}' for i in range(5, 55)])
+        self.assertRegex(response.context['previous_cursor'], r'^\d+_\d+$')
+        self.assertContains(response, f'href="?before={response.context["previous_cursor"]}"')
+        
+        response = self.client.get(self.url, {'before': response.context['previous_cursor']})
+        self.assertEqual(
+            [m.content for m in response.context['messages']], [f'Message {i}' for i in range(5)]
+        )
+        self.assertIsNone(response.context['previous_cursor'])
+        self.assertNotContains(response, 'Load older messages')
+    
+    def test_history_loads_only_rendered_columns(self):
+        """Test that messages are rendered without loading unused columns"""
+        self.add_message(self.user2, is_read=True)
+        with CaptureQueriesContext(connection) as one_message:
+            self.client.get(self.url)
+        
+        self.add_message(self.user2, is_read=True)
+        self.add_message(self.user2, is_read=True)
+        with self.assertNumQueries(len(one_message)):
+            response = self.client.get(self.url)
+        message = response.context['messages'][0]
+        self.assertIn('file', message.get_deferred_fields())
+        self.assertIn('password', message.sender.get_deferred_fields())
+        self.assertContains(response, 'user2')
+    
+    def test_send_message_bumps_chat(self):
+        """Test that sending a message bumps the chat's updated_at"""
+        PrivateChat.objects.filter(pk=self.chat.pk).update(
+            updated_at=timezone.now() - timezone.timedelta(days=1)
+        )
+        response = self.client.post(self.url, {'content': 'Hello'})
+        self.assertEqual(response.json(), {'success': True})
+        
+        self.chat.refresh_from_db()
+        self.assertGreater(self.chat.updated_at, timezone.now() - timezone.timedelta(minutes=1))
+        self.assertTrue(PrivateMessage.objects.filter(chat=self.chat, content='Hello').exists())
+    
+    def test_no_update_on_later_pages(self):
+        """Test that paging through history does not write"""
+        self.add_message(self.user2)
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'before': f'{timezone.now().timestamp() * 10 ** 6:.0f}_1'})
+        self.assertEqual(self.message_updates(queries), [])
+        self.assertTrue(PrivateMessage.objects.filter(is_read=False).exists())
+    
+    def test_invalid_cursor_rejected(self):
+        """Test that a malformed cursor is an error rather than the newest page"""
+        response = self.client.get(self.url, {'before': '2026-10-15T10:00:00.123456 00:00'})
+        self.assertEqual(response.status_code, 400)
+
+
+class UserSearchViewTest(TestCase):
+    """Test cases for the cached user search"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        for username in ('alice', 'alina', 'bob'):
+            User.objects.create_user(
+                username=username,
+                email=f'{username}@test.com',
+                password='testpass123'
+            )
+    
+    def search(self, username, query):
+        self.client.login(username=username, password='testpass123')
+        return self.client.get(reverse('chat:user_search'), {'q': query})
+    
+    def test_results_shared_between_searchers(self):
+        """Test that the same query is only run against the users table once"""
+        response = self.search('alice', 'ALI ')
+        self.assertEqual([user.username for user in response.context['users']], ['alina'])
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.search('bob', 'ali')
+        self.assertEqual(
+            sorted(user.username for user in response.context['users']), ['alice', 'alina']
+        )
+        self.assertFalse(any('LIKE' in query['sql'] for query in queries.captured_queries))
+        self.assertContains(response, '@alina')
+
+
+class RoomMessagesViewTest(TestCase):
+    """Test cases for the room messages JSON endpoint"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.teacher = User.objects.create_user(
+            username='teacher',
+            email='teacher@test.com',
+            password='testpass123',
+            user_type='teacher',
+            first_name='Tea'
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            description='Test description',
+            teacher=self.teacher
+        )
+        self.room = ChatRoom.objects.create(name='Room', course=self.course, created_by=self.teacher)
+        ChatMessage.objects.bulk_create([
+            ChatMessage(room=self.room, user=self.teacher, content=f'Message {i}')
+            for i in range(21)
+        ])
+    
+    def get(self, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.teacher
+        return views.get_room_messages(request, self.room.id)
+    
+    def test_newest_messages_returned(self):
+        """Test that the newest page is returned with a cursor for older messages"""
+        with self.assertNumQueries(2):
+            response = self.get()
+        data = json.loads(response.content)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(data['messages']), 20)
+        newest = ChatMessage.objects.latest('created_at')
+        self.assertEqual(data['messages'][0], {
+            'id': newest.id,
+            'content': newest.content,
+            'user': {
+                'id': self.teacher.id,
+                'username': 'teacher',
+                'first_name': 'Tea',
+                'last_name': '',
+            },
+            'created_at': newest.created_at.isoformat(),
+            'message_type': 'text',
+        })
+        self.assertTrue(data['has_previous'])
+        
+        data = json.loads(self.get(before=data['before']).content)
+        self.assertEqual([m['content'] for m in data['messages']], ['Message 0'])
+        self.assertFalse(data['has_previous'])
+    
+    def test_invalid_cursor_rejected(self):
+        """Test that a malformed cursor is a 400 instead of the first page again"""
+        response = self.get(before='2026-10-15T10:00:00.123456 00:00')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {'error': 'Invalid message cursor'})
+
+
 class ChatIntegrationTest(TestCase):
     """Integration tests for chat functionality"""
     
@@ -290,3 +855,39 @@ class ChatIntegrationTest(TestCase):
         # Check latest message
         latest = chat.messages.order_by('-created_at').first()
         self.assertEqual(latest, message2)
+
+
+class ChatAdminTest(TestCase):
+    """Test cases for the chat admin"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='testpass123'
+        )
+        course = Course.objects.create(
+            title='Test Course',
+            description='Test description',
+            teacher=self.admin
+        )
+        self.room = ChatRoom.objects.create(
+            name='Course Discussion',
+            course=course,
+            created_by=self.admin
+        )
+        self.client.force_login(self.admin)
+    
+    def test_message_changelist_previews_without_loading_content(self):
+        """Test the change list cuts previews in the database"""
+        ChatMessage.objects.create(room=self.room, user=self.admin, content='x' * 60 + 'zzzend')
+        ChatMessage.objects.create(room=self.room, user=self.admin, content='Short message')
+        
+        response = self.client.get(reverse('admin:chat_chatmessage_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'x' * 50 + '...')
+        self.assertNotContains(response, 'zzzend')
+        self.assertContains(response, 'Short message')
+        for message in response.context['cl'].result_list:
+            self.assertIn('content', message.get_deferred_fields())
@@ -1,17 +1,41 @@
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import orjson
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from .models import ChatRoom, ChatMessage, PrivateChat, PrivateMessage, ChatRoomMembership
 from courses.models import Course, Enrollment
 
 User = get_user_model()
 
+# Columns rendered by the chat/room_detail.html and chat/private_chat_detail.html
+# message lists, so history pages skip file paths and the users' other columns
+ROOM_MESSAGE_FIELDS = (
+    'id', 'content', 'created_at',
+    'user', 'user__username', 'user__first_name', 'user__last_name'
+)
+PRIVATE_MESSAGE_FIELDS = (
+    'id', 'content', 'created_at',
+    'sender', 'sender__username', 'sender__first_name', 'sender__last_name'
+)
+
+# Message cursors count microseconds from here
+MESSAGE_CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+USER_SEARCH_CACHE_KEY = 'chat:user-search:{}'
+USER_SEARCH_CACHE_TIMEOUT = 30
+# Columns rendered by chat/user_search.html
+USER_SEARCH_FIELDS = ('id', 'username', 'first_name', 'last_name', 'user_type', 'bio')
+
 
 @login_required
 def chat_room_list(request):
@@ -43,7 +67,7 @@ def chat_room_list(request):
 @login_required
 def chat_room_detail(request, room_id):
     """Display chat room with messages"""
-    room = get_object_or_404(ChatRoom, id=room_id, is_active=True)
+    room = get_object_or_404(ChatRoom.objects.select_related('course'), id=room_id, is_active=True)
     
     # Check permission
     if request.user.user_type == 'student':
@@ -55,15 +79,20 @@ def chat_room_detail(request, room_id):
             messages.error(request, "You don't have permission to access this chat room.")
             return redirect('accounts:dashboard')
     elif request.user.user_type == 'teacher':
-        if room.course.teacher != request.user:
+        if room.course.teacher_id != request.user.id:
             messages.error(request, "You don't have permission to access this chat room.")
             return redirect('accounts:dashboard')
     
-    # Get messages with pagination
-    chat_messages = ChatMessage.objects.filter(room=room).select_related('user').order_by('created_at')
-    paginator = Paginator(chat_messages, 50)  # Show 50 messages per page
-    page_number = request.GET.get('page')
-    messages_page = paginator.get_page(page_number)
+    # Get the latest 50 messages, or the 50 before the ``before`` cursor
+    try:
+        chat_messages, previous_cursor = get_message_page(
+            ChatMessage.objects.filter(room=room).select_related('user').only(*ROOM_MESSAGE_FIELDS),
+            request.GET.get('before'),
+            50
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Invalid message cursor')
+    chat_messages.reverse()
     
     # Mark user as participant if not already
     membership, created = ChatRoomMembership.objects.get_or_create(
@@ -77,7 +106,8 @@ def chat_room_detail(request, room_id):
     
     return render(request, 'chat/room_detail.html', {
         'room': room,
-        'chat_messages': messages_page,
+        'chat_messages': chat_messages,
+        'previous_cursor': previous_cursor,
         'user': request.user,
         'participant_count': participant_count
     })
@@ -90,7 +120,7 @@ def create_chat_room(request, course_id):
     course = get_object_or_404(Course, id=course_id)
     
     # Only teachers can create chat rooms for their courses
-    if request.user.user_type != 'teacher' or course.teacher != request.user:
+    if request.user.user_type != 'teacher' or course.teacher_id != request.user.id:
         messages.error(request, 'Permission denied. You can only create chat rooms for your own courses.')
         return redirect('accounts:dashboard')
     
@@ -107,33 +137,27 @@ def create_chat_room(request, course_id):
             messages.error(request, f'A chat room already exists for "{course.title}".')
             return redirect('accounts:dashboard')
         
-        chat_room = ChatRoom.objects.create(
-            name=name,
-            description=description,
-            course=course,
-            created_by=request.user
-        )
-        
-        # Add the teacher as a member
-        ChatRoomMembership.objects.create(
-            user=request.user,
-            room=chat_room
-        )
-        
         # Add all enrolled students as participants
-        enrolled_students = User.objects.filter(
+        enrolled_student_ids = list(User.objects.filter(
             enrollments__course=course,
             enrollments__is_active=True
-        )
+        ).values_list('id', flat=True))
         
-        for student in enrolled_students:
-            ChatRoomMembership.objects.create(
-                user=student,
-                room=chat_room,
-                role='member'
+        with transaction.atomic():
+            chat_room = ChatRoom.objects.create(
+                name=name,
+                description=description,
+                course=course,
+                created_by=request.user
             )
+            
+            # Add the teacher and the students as members in one INSERT
+            ChatRoomMembership.objects.bulk_create([
+                ChatRoomMembership(user_id=user_id, room=chat_room)
+                for user_id in [request.user.id] + enrolled_student_ids
+            ], batch_size=500, ignore_conflicts=True)
         
-        messages.success(request, f'Chat room "{name}" created successfully! {enrolled_students.count()} students added as participants.')
+        messages.success(request, f'Chat room "{name}" created successfully! {len(enrolled_student_ids)} students added as participants.')
         return redirect('chat:room_detail', room_id=chat_room.id)
     
     # If GET request, redirect to course selection
@@ -152,15 +176,26 @@ def create_chat_room(request, course_id):
 @login_required
 def private_chat_list(request):
     """List all private chats for the user"""
+    last_message_id = PrivateMessage.objects.filter(
+        chat=models.OuterRef('pk')
+    ).order_by('-created_at', '-id').values('id')[:1]
     private_chats = PrivateChat.objects.filter(
-        models.Q(participant1=request.user) | models.Q(participant2=request.user)
-    ).select_related('participant1', 'participant2').order_by('-updated_at')
+        participants=request.user
+    ).select_related('participant1', 'participant2').annotate(
+        last_message_id=models.Subquery(last_message_id)
+    ).order_by('-updated_at', '-id')
+    page_obj = Paginator(private_chats, 25).get_page(request.GET.get('page'))
+    
+    # Fetch the last message of every chat on the page in one query
+    last_messages = PrivateMessage.objects.select_related('sender').in_bulk(
+        [chat.last_message_id for chat in page_obj if chat.last_message_id]
+    )
     
     # Add the other participant info for each chat
     chat_data = []
-    for chat in private_chats:
+    for chat in page_obj:
         other_user = chat.participant2 if chat.participant1 == request.user else chat.participant1
-        last_message = chat.messages.last()
+        last_message = last_messages.get(chat.last_message_id)
         chat_data.append({
             'chat': chat,
             'other_user': other_user,
@@ -168,7 +203,9 @@ def private_chat_list(request):
         })
     
     return render(request, 'chat/private_chat_list.html', {
-        'chat_data': chat_data
+        'chat_data': chat_data,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages()
     })
 
 
@@ -182,11 +219,7 @@ def private_chat_detail(request, user_id):
         return redirect('chat:private_list')
     
     # Get or create private chat
-    user1, user2 = sorted([request.user, other_user], key=lambda u: u.id)
-    private_chat, created = PrivateChat.objects.get_or_create(
-        participant1=user1,
-        participant2=user2
-    )
+    private_chat, created = PrivateChat.get_or_create_between(request.user, other_user)
     
     # Handle POST request (sending a message)
     if request.method == 'POST':
@@ -198,33 +231,105 @@ def private_chat_detail(request, user_id):
                 content=content
             )
             # Update chat timestamp
-            private_chat.updated_at = timezone.now()
-            private_chat.save()
+            PrivateChat.objects.filter(pk=private_chat.pk).update(updated_at=timezone.now())
             
             return JsonResponse({'success': True})
         return JsonResponse({'error': 'Message content is required'}, status=400)
     
-    # Get messages with pagination
-    messages_list = PrivateMessage.objects.filter(chat=private_chat).select_related('sender').order_by('created_at')
-    paginator = Paginator(messages_list, 50)
-    page_number = request.GET.get('page')
-    messages_page = paginator.get_page(page_number)
+    # Get the latest 50 messages, or the 50 before the ``before`` cursor
+    before = request.GET.get('before')
+    try:
+        messages_list, previous_cursor = get_message_page(
+            PrivateMessage.objects.filter(chat=private_chat).select_related('sender').only(*PRIVATE_MESSAGE_FIELDS),
+            before,
+            50
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Invalid message cursor')
+    messages_list.reverse()
     
-    # Mark messages as read
-    PrivateMessage.objects.filter(
+    # Mark messages as read when the chat is opened, skipping the write
+    # when there is nothing unread (the common case when re-opening a chat)
+    unread_messages = PrivateMessage.objects.filter(
         chat=private_chat,
         sender=other_user,
         is_read=False
-    ).update(is_read=True)
+    )
+    if not before and unread_messages.exists():
+        unread_messages.update(is_read=True)
     
     return render(request, 'chat/private_chat_detail.html', {
         'private_chat': private_chat,
         'other_user': other_user,
-        'messages': messages_page,
+        'messages': messages_list,
+        'previous_cursor': previous_cursor,
         'user': request.user
     })
 
 
+def encode_message_cursor(message):
+    """
+    URL-safe cursor pointing just past ``message``: its ``created_at`` in
+    microseconds since the epoch and its id, which breaks timestamp ties
+    """
+    if isinstance(message, dict):
+        created_at, message_id = message['created_at'], message['id']
+    else:
+        created_at, message_id = message.created_at, message.id
+    return f'{(created_at - MESSAGE_CURSOR_EPOCH) // timedelta(microseconds=1)}_{message_id}'
+
+
+def decode_message_cursor(cursor):
+    """``(created_at, id)`` from a message cursor, raising ValueError if it is malformed"""
+    microseconds, message_id = cursor.split('_')
+    return MESSAGE_CURSOR_EPOCH + timedelta(microseconds=int(microseconds)), int(message_id)
+
+
+def get_message_page(queryset, before, page_size):
+    """
+    The newest ``page_size`` messages older than the ``before`` cursor
+    
+    Keyset pagination: each page is a range scan on ``(created_at, id)``,
+    however far back it is, where OFFSET would read and discard every newer
+    message. Returns the messages (instances or ``values()`` dicts) newest
+    first and the cursor for the page before them (None when there are no
+    older messages). Raises ValueError for a malformed cursor.
+    """
+    if before:
+        created_at, message_id = decode_message_cursor(before)
+        queryset = queryset.filter(
+            models.Q(created_at__lt=created_at) |
+            models.Q(created_at=created_at, id__lt=message_id)
+        )
+    page = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_message_cursor(page[-1])
+    return page, None
+
+
+def search_users(query):
+    """
+    Users matching ``query``, shared between searchers for a few seconds
+    
+    Autocomplete sends the same prefixes over and over, so the unindexable
+    ``icontains`` scan runs once per query rather than once per keystroke.
+    One extra row is kept so the searcher can be dropped from the results.
+    """
+    normalized = query.strip().lower()
+    cache_key = USER_SEARCH_CACHE_KEY.format(hashlib.md5(normalized.encode()).hexdigest())
+    return cache.get_or_set(
+        cache_key,
+        lambda: list(User.objects.filter(
+            models.Q(username__icontains=normalized) | 
+            models.Q(first_name__icontains=normalized) | 
+            models.Q(last_name__icontains=normalized) |
+            models.Q(email__icontains=normalized)
+        ).only(*USER_SEARCH_FIELDS)[:11]),
+        USER_SEARCH_CACHE_TIMEOUT
+    )
+
+
 @login_required
 def user_search(request):
     """Search for users to start private chat"""
@@ -232,12 +337,7 @@ def user_search(request):
     users = []
     
     if query:
-        users = User.objects.filter(
-            models.Q(username__icontains=query) | 
-            models.Q(first_name__icontains=query) | 
-            models.Q(last_name__icontains=query) |
-            models.Q(email__icontains=query)
-        ).exclude(id=request.user.id)[:10]
+        users = [user for user in search_users(query) if user.id != request.user.id][:10]
     
     return render(request, 'chat/user_search.html', {
         'users': users,
@@ -248,7 +348,7 @@ def user_search(request):
 @login_required
 def get_room_messages(request, room_id):
     """API endpoint to get room messages"""
-    room = get_object_or_404(ChatRoom, id=room_id)
+    room = get_object_or_404(ChatRoom.objects.select_related('course'), id=room_id)
     
     # Check permission
     if request.user.user_type == 'student':
@@ -259,36 +359,40 @@ def get_room_messages(request, room_id):
         ).exists():
             return JsonResponse({'error': 'Permission denied'}, status=403)
     elif request.user.user_type == 'teacher':
-        if room.course.teacher != request.user:
+        if room.course.teacher_id != request.user.id:
             return JsonResponse({'error': 'Permission denied'}, status=403)
     
-    page = int(request.GET.get('page', 1))
-    messages = ChatMessage.objects.filter(room=room).select_related('user').order_by('-created_at')
-    paginator = Paginator(messages, 20)
-    messages_page = paginator.get_page(page)
-    
-    messages_data = []
-    for message in messages_page:
-        messages_data.append({
-            'id': message.id,
-            'content': message.content,
-            'user': {
-                'id': message.user.id,
-                'username': message.user.username,
-                'first_name': message.user.first_name,
-                'last_name': message.user.last_name,
-            },
-            'created_at': message.created_at.isoformat(),
-            'message_type': message.message_type,
-        })
+    # Read plain rows rather than model instances; orjson writes the datetimes
+    try:
+        messages_page, previous_cursor = get_message_page(
+            ChatMessage.objects.filter(room=room).values(
+                'id', 'content', 'created_at', 'message_type',
+                'user_id', 'user__username', 'user__first_name', 'user__last_name'
+            ),
+            request.GET.get('before'),
+            20
+        )
+    except ValueError:
+        return JsonResponse({'error': 'Invalid message cursor'}, status=400)
+    
+    messages_data = [{
+        'id': message['id'],
+        'content': message['content'],
+        'user': {
+            'id': message['user_id'],
+            'username': message['user__username'],
+            'first_name': message['user__first_name'],
+            'last_name': message['user__last_name'],
+        },
+        'created_at': message['created_at'],
+        'message_type': message['message_type'],
+    } for message in messages_page]
     
-    return JsonResponse({
+    return HttpResponse(orjson.dumps({
         'messages': messages_data,
-        'has_next': messages_page.has_next(),
-        'has_previous': messages_page.has_previous(),
-        'total_pages': paginator.num_pages,
-        'current_page': page
-    })
+        'has_previous': previous_cursor is not None,
+        'before': previous_cursor
+    }), content_type='application/json')
 
 
 @login_required
@@ -302,11 +406,7 @@ def start_private_chat(request, user_id):
         return redirect('chat:user_search')
     
     # Get or create private chat
-    user1, user2 = sorted([request.user, other_user], key=lambda u: u.id)
-    private_chat, created = PrivateChat.objects.get_or_create(
-        participant1=user1,
-        participant2=user2
-    )
+    private_chat, created = PrivateChat.get_or_create_between(request.user, other_user)
     
     if created:
         messages.success(request, f'Started new chat with {other_user.get_full_name() or other_user.username}!')
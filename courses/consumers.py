@@ -1,4 +1,4 @@
-import json
+import orjson
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
@@ -38,7 +38,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Handle messages from WebSocket"""
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
             
             if message_type == 'mark_read':
@@ -47,34 +47,28 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 if notification_id:
                     await self.mark_notification_read(notification_id)
                     
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
     
     async def notification_message(self, event):
         """Send notification to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=orjson.dumps({
             'type': 'notification',
             'data': event['data']
-        }))
+        }).decode())
     
     async def notification_count_update(self, event):
         """Send notification count update to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=orjson.dumps({
             'type': 'count_update',
             'count': event['count']
-        }))
+        }).decode())
     
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
         """Mark a notification as read"""
         from courses.models import Notification
-        try:
-            notification = Notification.objects.get(
-                id=notification_id,
-                recipient=self.scope["user"]
-            )
-            notification.is_read = True
-            notification.save()
-            return True
-        except Notification.DoesNotExist:
-            return False
+        return Notification.objects.filter(
+            id=notification_id,
+            recipient=self.scope["user"]
+        ).update(is_read=True) > 0
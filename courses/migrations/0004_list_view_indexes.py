@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-15 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_enrollment_is_blocked'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coursematerial',
+            index=models.Index(fields=['course', 'order', '-created_at'], name='courses_cou_course__d4118a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', '-created_at'], name='courses_not_recipie_689a50_idx'),
+        ),
+    ]
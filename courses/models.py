@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -144,12 +144,14 @@ class Course(models.Model):
         if not self.is_published:
             return False, "Course is not available"
         
-        # Check if student is blocked
-        existing_enrollment = self.enrollments.filter(student=user).first()
-        if existing_enrollment and existing_enrollment.is_blocked:
+        # Check if student is blocked or already enrolled, fetching only the flags
+        existing_enrollment = self.enrollments.filter(student=user).values(
+            'is_blocked', 'is_active'
+        ).first()
+        if existing_enrollment and existing_enrollment['is_blocked']:
             return False, "You are blocked from this course"
         
-        if self.enrollments.filter(student=user, is_active=True).exists():
+        if existing_enrollment and existing_enrollment['is_active']:
             return False, "Already enrolled"
         
         return True, "Can enroll"
@@ -232,6 +234,10 @@ class CourseMaterial(models.Model):
         ordering = ['order', '-created_at']
         verbose_name = 'Course Material'
         verbose_name_plural = 'Course Materials'
+        indexes = [
+            # A course's materials, in display order
+            models.Index(fields=['course', 'order', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.course.title} - {self.title}"
@@ -306,6 +312,34 @@ class Enrollment(models.Model):
     def __str__(self):
         return f"{self.student.username} enrolled in {self.course.title}"
     
+    @classmethod
+    def enroll_and_notify(cls, student, course):
+        """
+        Enroll ``student`` in ``course`` and tell them about it, returning
+        ``(enrollment, created)``.
+        
+        Repeat enrollments cost a single SELECT; new ones insert the
+        enrollment and the student's notification in one transaction.
+        """
+        enrollment = cls.objects.filter(student=student, course=course).first()
+        if enrollment is not None:
+            return enrollment, False
+        
+        try:
+            with transaction.atomic():
+                enrollment = cls.objects.create(student=student, course=course)
+                Notification.objects.create(
+                    recipient=student,
+                    title=f"Enrolled in {course.title}",
+                    message=f"You have successfully enrolled in the course '{course.title}'.",
+                    notification_type='enrollment',
+                    course=course
+                )
+        except IntegrityError:
+            # A concurrent request enrolled the student first
+            return cls.objects.get(student=student, course=course), False
+        return enrollment, True
+    
     @property
     def is_completed(self):
         return self.progress >= 100
@@ -458,6 +492,8 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['recipient', '-created_at']),
             models.Index(fields=['is_read', '-created_at']),
+            # Unread counts on every page and ?is_read= filtered inboxes
+            models.Index(fields=['recipient', 'is_read', '-created_at']),
         ]
     
     def __str__(self):
@@ -1,3 +1,5 @@
+import asyncio
+
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
@@ -10,6 +12,13 @@ User = get_user_model()
 channel_layer = get_channel_layer()
 
 
+async def group_send_all(events):
+    """Send each ``(group, message)`` pair on the channel layer concurrently"""
+    await asyncio.gather(*(
+        channel_layer.group_send(group, message) for group, message in events
+    ))
+
+
 @receiver(post_save, sender=CourseMaterial)
 def notify_students_new_material(sender, instance, created, **kwargs):
     """
@@ -43,11 +52,10 @@ def notify_students_new_material(sender, instance, created, **kwargs):
         if notifications:
             Notification.objects.bulk_create(notifications)
             
-            # Send real-time notifications to each student
-            for notification in notifications:
-                user_group = f"notifications_{notification.recipient.id}"
-                async_to_sync(channel_layer.group_send)(
-                    user_group,
+            # Send real-time notifications to every student in one trip to the event loop
+            async_to_sync(group_send_all)([
+                (
+                    f"notifications_{notification.recipient.id}",
                     {
                         'type': 'notification_message',
                         'data': {
@@ -60,6 +68,8 @@ def notify_students_new_material(sender, instance, created, **kwargs):
                         }
                     }
                 )
+                for notification in notifications
+            ])
 
 
 @receiver(post_save, sender=Enrollment)
@@ -6,6 +6,7 @@ from django.utils.text import slugify
 from .models import Course, CourseMaterial, Enrollment, Feedback, Notification, MaterialCompletion, CourseCompletion
 from .forms import CourseForm, FeedbackForm, CourseMaterialForm
 import tempfile
+from unittest import mock
 from decimal import Decimal
 
 User = get_user_model()
@@ -186,6 +187,51 @@ class EnrollmentModelTest(TestCase):
         self.assertEqual(str(enrollment), expected_str)
 
 
+class MaterialNotificationTest(TestCase):
+    """Test cases for notifying students about new materials"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.teacher = User.objects.create_user(
+            username='teacher',
+            email='teacher@test.com',
+            password='testpass123',
+            user_type='teacher'
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            description='Test description',
+            teacher=self.teacher,
+            status='published'
+        )
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}',
+                email=f'student{i}@test.com',
+                password='testpass123',
+                user_type='student'
+            )
+            for i in range(2)
+        ]
+        Enrollment.objects.bulk_create([
+            Enrollment(student=student, course=self.course) for student in self.students
+        ])
+    
+    def test_students_notified_of_new_material(self):
+        """Test that every enrolled student gets a notification and a broadcast"""
+        with mock.patch('courses.signals.channel_layer') as channel_layer:
+            channel_layer.group_send = mock.AsyncMock()
+            CourseMaterial.objects.create(course=self.course, title='Week 1')
+        
+        self.assertEqual(
+            Notification.objects.filter(notification_type='material').count(), 2
+        )
+        self.assertCountEqual(
+            [call.args[0] for call in channel_layer.group_send.await_args_list],
+            [f'notifications_{student.id}' for student in self.students]
+        )
+
+
 class FeedbackModelTest(TestCase):
     """Test cases for Feedback model"""
     
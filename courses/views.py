@@ -7,7 +7,7 @@ from django.views.generic import (
 )
 from django.urls import reverse_lazy, reverse
 from django.db.models import Q, Avg, Count
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponseForbidden, Http404
 from django.core.paginator import Paginator
 from django.utils.decorators import method_decorator
 from django.utils import timezone
@@ -107,24 +107,20 @@ class CourseDetailView(DetailView):
             context['can_enroll'] = can_enroll
             context['enroll_message'] = message
             
-            # Check if user is enrolled
-            is_enrolled = course.enrollments.filter(
+            # Check if user is enrolled (one query serves both the flag and progress tracking)
+            enrollment = course.enrollments.filter(
                 student=self.request.user, 
                 is_active=True
-            ).exists()
+            ).first()
+            is_enrolled = enrollment is not None
             context['is_enrolled'] = is_enrolled
             
             # Get enrollment data for progress tracking
             if is_enrolled:
-                enrollment = course.enrollments.filter(
-                    student=self.request.user, 
-                    is_active=True
-                ).first()
                 context['enrollment'] = enrollment
                 
                 # Update progress
-                if enrollment:
-                    enrollment.update_progress()
+                enrollment.update_progress()
                 
                 # Get completed materials for this user
                 completed_materials = MaterialCompletion.objects.filter(
@@ -140,8 +136,7 @@ class CourseDetailView(DetailView):
         
         # Get course materials (public or enrolled students)
         if (self.request.user.is_authenticated and 
-            (course.enrollments.filter(student=self.request.user, is_active=True).exists() or
-             self.request.user == course.teacher)):
+            (context['is_enrolled'] or self.request.user == course.teacher)):
             context['materials'] = course.materials.all()
         else:
             context['materials'] = course.materials.filter(is_public=True)
@@ -819,12 +814,11 @@ def notifications_view(request):
 def mark_notification_read(request, notification_id):
     """Mark a specific notification as read"""
     if request.method == 'POST':
-        notification = get_object_or_404(
-            Notification, 
+        updated = Notification.objects.filter(
             id=notification_id, 
             recipient=request.user
-        )
-        notification.is_read = True
-        notification.save()
+        ).update(is_read=True)
+        if not updated:
+            raise Http404('Notification not found')
         return JsonResponse({'success': True})
     return JsonResponse({'success': False})
@@ -0,0 +1,16 @@
+"""
+Celery application for elearning project.
+
+Background work (e.g. image processing) is defined in each app's ``tasks``
+module and picked up by autodiscovery.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'elearning.settings')
+
+app = Celery('elearning')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
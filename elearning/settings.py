@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from decouple import config
 import dj_database_url
 
@@ -115,6 +116,14 @@ DATABASES = {
 }
 
 
+# Running under `manage.py test`
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+if TESTING and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # The test database is throwaway, so commits need not wait for the WAL flush
+    DATABASES['default'].setdefault('OPTIONS', {})['options'] = '-c synchronous_commit=off'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -133,6 +142,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Spread test classes over all CPU cores; see elearning/test_runner.py
+TEST_RUNNER = 'elearning.test_runner.ParallelDiscoverRunner'
+
+if TESTING:
+    # PBKDF2 dominates fixture setup time; a fast hasher is fine for tests
+    PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -154,6 +172,10 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+if TESTING:
+    # Tests render templates without running collectstatic first
+    STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -169,13 +191,13 @@ AUTH_USER_MODEL = 'accounts.User'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.StandardPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -185,15 +207,25 @@ REST_FRAMEWORK = {
 }
 
 # Channels settings
+# Set CHANNEL_LAYER_BACKEND=channels_redis.pubsub.RedisPubSubChannelLayer to
+# broadcast each group message with one PUBLISH instead of a write per member
+CHANNEL_LAYER_BACKEND = config('CHANNEL_LAYER_BACKEND', default='channels_redis.core.RedisChannelLayer')
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'BACKEND': CHANNEL_LAYER_BACKEND,
         'CONFIG': {
             "hosts": [config('REDIS_URL', default='redis://localhost:6379')],
         },
     },
 }
 
+if CHANNEL_LAYER_BACKEND == 'channels_redis.core.RedisChannelLayer':
+    # Let busy rooms queue more events per channel, and drop undelivered ones sooner
+    CHANNEL_LAYERS['default']['CONFIG'].update({
+        'capacity': config('CHANNEL_LAYER_CAPACITY', default=1500, cast=int),
+        'expiry': config('CHANNEL_LAYER_EXPIRY', default=10, cast=int),
+    })
+
 # CORS/CSRF/Hosts settings (configurable via env)
 CSRF_TRUSTED_ORIGINS = [o for o in config('CSRF_TRUSTED_ORIGINS', default='').split(',') if o]
 CORS_ALLOWED_ORIGINS = [o for o in config('CORS_ALLOWED_ORIGINS', default='').split(',') if o]
@@ -221,6 +253,14 @@ CACHES = {
     }
 }
 
+if TESTING:
+    # Tests should not need a running Redis server just for caching
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Session settings
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_SAVE_EVERY_REQUEST = True
@@ -228,3 +268,30 @@ SESSION_SAVE_EVERY_REQUEST = True
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
+
+# Celery settings
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=config('REDIS_URL', default='redis://localhost:6379'))
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    'flush-profile-views': {
+        'task': 'accounts.tasks.flush_profile_views',
+        'schedule': config('PROFILE_VIEWS_FLUSH_INTERVAL', default=60, cast=int),
+    },
+}
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'accounts': {
+            'handlers': ['console'],
+            'level': config('ACCOUNTS_LOG_LEVEL', default='WARNING'),
+        },
+    },
+}
@@ -0,0 +1,18 @@
+"""
+Test runner for elearning project.
+
+Runs test classes in parallel across processes by default. Pass
+``--parallel 1`` to run serially (e.g. with ``--pdb``), or set
+``DJANGO_TEST_PROCESSES`` to cap the number of worker processes.
+"""
+
+from django.test.runner import DiscoverRunner
+
+
+class ParallelDiscoverRunner(DiscoverRunner):
+    """DiscoverRunner that defaults to one test process per CPU core"""
+    
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel='auto')